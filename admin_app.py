@@ -0,0 +1,83 @@
+import streamlit as st
+import admin_backend
+from admin_backend import VALIDATION_STATUSES, RESULT_STATUSES, fetch_summary, count_applicants, fetch_applicants
+
+# ----------------- ADMISSION CELL DASHBOARD -----------------
+# Every rerun reads the pre-aggregated counters and a single page of
+# applicants, so the page costs the same at 500 or 500k applications.
+st.set_page_config(page_title="Admission Cell", layout="wide")
+
+
+@st.cache_resource
+def init_admin_db():
+    # once per server process: creates Admission_Stats, its triggers and indexes
+    admin_backend.init_admin_stats()
+
+
+init_admin_db()
+st.title("🏛️ Admission Cell Dashboard")
+
+# ----------------- SUMMARY -----------------
+totals, streams = fetch_summary()
+cols = st.columns(6)
+cols[0].metric("Applications", totals["Applications"])
+cols[1].metric("Validated", totals["Validated"])
+cols[2].metric("Valid", totals["Valid"])
+cols[3].metric("Accepted", totals["Accepted"])
+cols[4].metric("Pending emails", totals["Pending emails"])
+cols[5].metric("Seats left", totals["Seats left"])
+st.dataframe(streams, hide_index=True, use_container_width=True)
+
+# ----------------- FILTERS -----------------
+ALL = "All"
+stream_names = [row["Stream"] for row in streams if row["Stream"] != "(none)"]
+with st.sidebar:
+    st.header("Filters")
+    stream = st.selectbox("Stream", [ALL] + stream_names)
+    validation = st.selectbox("Validation", [ALL] + VALIDATION_STATUSES)
+    result = st.selectbox("Shortlist result", [ALL] + RESULT_STATUSES)
+    order = {"Email": "email", "JEE rank": "jee_rank"}[st.radio("Sort by", ["Email", "JEE rank"])]
+    page_size = st.select_slider("Rows per page", [25, 50, 100, 200], value=50)
+    st.divider()
+    st.button("Recount statistics", on_click=admin_backend.rebuild_stats,
+              help="Full recount of the dashboard counters (normally kept up to date by triggers)")
+
+filters = {
+    "stream": None if stream == ALL else stream,
+    "validation": None if validation == ALL else validation,
+    "result": None if result == ALL else result,
+}
+
+# keyset cursors of the pages visited so far; any filter change starts over
+view = (tuple(filters.values()), order, page_size)
+if st.session_state.get("view") != view:
+    st.session_state.view = view
+    st.session_state.cursors = [None]
+
+# ----------------- APPLICANTS -----------------
+cursors = st.session_state.cursors
+matching = count_applicants(**filters)
+rows, next_cursor = fetch_applicants(order=order, after=cursors[-1], limit=page_size, **filters)
+
+page_no = len(cursors)
+pages = max(1, -(-matching // page_size))
+st.subheader(f"Applicants ({matching} matching) — page {page_no} of {pages}")
+if rows:
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+else:
+    st.info("No applicants match these filters.")
+
+prev_col, next_col, _ = st.columns([1, 1, 6])
+prev_col.button("⬅️ Previous", disabled=page_no == 1, on_click=cursors.pop)
+next_col.button("Next ➡️", disabled=next_cursor is None, on_click=cursors.append, args=(next_cursor,))
+
+# ----------------- DUPLICATE DOCUMENTS -----------------
+# documents that look like a copy of another applicant's upload, newest first
+flag_total, flags = admin_backend.fetch_duplicate_flags()
+st.subheader(f"🪞 Possible duplicate documents ({flag_total})")
+if flags:
+    if flag_total > len(flags):
+        st.caption(f"Showing the newest {len(flags)}")
+    st.dataframe(flags, hide_index=True, use_container_width=True)
+else:
+    st.info("No documents flagged as duplicates.")
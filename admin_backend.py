@@ -0,0 +1,319 @@
+import sqlite3
+
+from config import DB_PATH
+import metrics
+
+# ----------------- ADMIN DATA LAYER -----------------
+# Queries behind admin_app.py. Nothing here scans Application_Data on a
+# page load: counters come from Admission_Stats, which triggers keep up to
+# date on every insert/update/delete, and applicant lists are read one page
+# at a time with keyset pagination over indexed columns.
+#
+# Admission_Stats holds one row per (stream, validation status, result
+# status) cell, so the count behind any combination of dashboard filters is
+# a sum over at most a few dozen rows.
+
+VALIDATION_STATUSES = ["pending", "valid", "invalid"]
+RESULT_STATUSES = ["none", "accepted", "rejected"]
+# applicants without a JEE rank sort last; a NULL key would break the
+# row-value comparison of the keyset cursor
+UNRANKED = 2**31 - 1
+RANK_KEY = f"IFNULL(JEE_Rank, {UNRANKED})"
+PAGE_ORDERS = {"email": ("a.Email",), "jee_rank": (f"IFNULL(a.JEE_Rank, {UNRANKED})", "a.Email")}
+
+# Page filters written as plain comparisons (same meaning as the CASE
+# expressions below) so SQLite can drive the query from an index
+VALIDATION_FILTERS = {
+    "pending": "IFNULL(a.application_validation_done, 0) = 0",
+    "valid": "a.application_validation_done = 1 AND a.application_valid = 1",
+    "invalid": "a.application_validation_done = 1 AND IFNULL(a.application_valid, 0) = 0",
+}
+RESULT_FILTERS = {
+    "none": "IFNULL(r.shortlisting_done, 0) = 0",
+    "accepted": "r.shortlisting_done = 1 AND r.acceptance_status = 1",
+    "rejected": "r.shortlisting_done = 1 AND IFNULL(r.acceptance_status, 0) = 0",
+}
+
+
+def _validation(row):
+    return (f"CASE WHEN IFNULL({row}.application_validation_done, 0) = 0 THEN 'pending' "
+            f"WHEN IFNULL({row}.application_valid, 0) != 0 THEN 'valid' ELSE 'invalid' END")
+
+
+def _pending_validation_email(row):
+    return (f"(IFNULL({row}.application_validation_done, 0) != 0 AND IFNULL({row}.application_valid, 0) = 0 "
+            f"AND IFNULL({row}.application_validation_status_email_sent, 0) = 0)")
+
+
+def _result(row):
+    return (f"CASE WHEN IFNULL({row}.shortlisting_done, 0) = 0 THEN 'none' "
+            f"WHEN IFNULL({row}.acceptance_status, 0) != 0 THEN 'accepted' ELSE 'rejected' END")
+
+
+def _pending_result_email(row):
+    return f"(IFNULL({row}.shortlisting_done, 0) != 0 AND IFNULL({row}.acceptance_status_email_sent, 0) = 0)"
+
+
+def _bump(sign, stream, validation, result, pending_validation, pending_result):
+    """Trigger statement adding sign * one applicant to a stats cell"""
+    return f"""
+        INSERT INTO Admission_Stats (Stream, Validation_Status, Result_Status, Applicants,
+                                     Pending_Validation_Emails, Pending_Result_Emails)
+        VALUES (IFNULL({stream}, ''), {validation}, {result}, {sign}, {sign} * {pending_validation}, {sign} * {pending_result})
+        ON CONFLICT(Stream, Validation_Status, Result_Status) DO UPDATE SET
+            Applicants = Applicants + excluded.Applicants,
+            Pending_Validation_Emails = Pending_Validation_Emails + excluded.Pending_Validation_Emails,
+            Pending_Result_Emails = Pending_Result_Emails + excluded.Pending_Result_Emails;"""
+
+
+def _application_cell(row):
+    """Stats cell of an Application_Data row (OLD/NEW), looking up its result"""
+    lookup = "(SELECT {} FROM Admission_Results r WHERE r.Email = " + row + ".Email)"
+    return (f"{row}.Stream_Applied", _validation(row), f"IFNULL({lookup.format(_result('r'))}, 'none')",
+            _pending_validation_email(row), f"IFNULL({lookup.format(_pending_result_email('r'))}, 0)")
+
+
+def _result_cell(row, result=None, pending_result=None):
+    """Stats cell of an Admission_Results row (OLD/NEW), looking up its application"""
+    lookup = "(SELECT {} FROM Application_Data a WHERE a.Email = " + row + ".Email)"
+    return (lookup.format("a.Stream_Applied"), lookup.format(_validation("a")),
+            result or _result(row), lookup.format(_pending_validation_email("a")),
+            pending_result or _pending_result_email(row))
+
+
+def _has_application(row):
+    return f"EXISTS (SELECT 1 FROM Application_Data a WHERE a.Email = {row}.Email)"
+
+
+TRACKED_APPLICATION_COLUMNS = ["Stream_Applied", "application_validation_done", "application_valid",
+                               "application_validation_status_email_sent"]
+TRACKED_RESULT_COLUMNS = ["shortlisting_done", "acceptance_status", "acceptance_status_email_sent"]
+
+
+def _changed(columns):
+    return " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in columns)
+
+
+TRIGGERS = {
+    "stats_application_insert": f"""
+        AFTER INSERT ON Application_Data BEGIN {_bump(1, *_application_cell("NEW"))} END""",
+    "stats_application_delete": f"""
+        AFTER DELETE ON Application_Data BEGIN {_bump(-1, *_application_cell("OLD"))} END""",
+    "stats_application_update": f"""
+        AFTER UPDATE OF {", ".join(TRACKED_APPLICATION_COLUMNS)} ON Application_Data
+        WHEN {_changed(TRACKED_APPLICATION_COLUMNS)}
+        BEGIN {_bump(-1, *_application_cell("OLD"))} {_bump(1, *_application_cell("NEW"))} END""",
+    # a results row moves its applicant out of (or back into) the 'none' result cell
+    "stats_result_insert": f"""
+        AFTER INSERT ON Admission_Results WHEN {_has_application("NEW")}
+        BEGIN {_bump(-1, *_result_cell("NEW", "'none'", "0"))} {_bump(1, *_result_cell("NEW"))} END""",
+    "stats_result_delete": f"""
+        AFTER DELETE ON Admission_Results WHEN {_has_application("OLD")}
+        BEGIN {_bump(-1, *_result_cell("OLD"))} {_bump(1, *_result_cell("OLD", "'none'", "0"))} END""",
+    "stats_result_update": f"""
+        AFTER UPDATE OF {", ".join(TRACKED_RESULT_COLUMNS)} ON Admission_Results
+        WHEN ({_changed(TRACKED_RESULT_COLUMNS)}) AND {_has_application("NEW")}
+        BEGIN {_bump(-1, *_result_cell("OLD"))} {_bump(1, *_result_cell("NEW"))} END""",
+}
+
+INDEXES = {
+    "idx_application_stream_email": "Application_Data (Stream_Applied, Email)",
+    "idx_application_stream_ranked": f"Application_Data (Stream_Applied, {RANK_KEY}, Email)",
+    "idx_application_ranked": f"Application_Data ({RANK_KEY}, Email)",
+    "idx_application_rank": "Application_Data (JEE_Rank, Email)",  # counselling round order
+    "idx_result_status_email": "Admission_Results (shortlisting_done, acceptance_status, Email)",
+}
+# superseded by the IFNULL(JEE_Rank) expression index
+DROPPED_INDEXES = ["idx_application_stream_rank"]
+
+
+def init_admin_stats(db_path=DB_PATH):
+    """Aggregate table, its triggers and the pagination indexes; backfills once on an existing DB"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Admission_Stats (
+        Stream VARCHAR(100) NOT NULL,
+        Validation_Status VARCHAR(10) NOT NULL,
+        Result_Status VARCHAR(10) NOT NULL,
+        Applicants INTEGER NOT NULL DEFAULT 0,
+        Pending_Validation_Emails INTEGER NOT NULL DEFAULT 0,
+        Pending_Result_Emails INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (Stream, Validation_Status, Result_Status)
+    )
+    """)
+    for name in DROPPED_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+    for name, definition in INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+    for name, body in TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+    conn.commit()
+
+    # tables created before the triggers existed need one full count
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM Admission_Stats), EXISTS (SELECT 1 FROM Application_Data)")
+    has_stats, has_applications = cursor.fetchone()
+    conn.close()
+    if has_applications and not has_stats:
+        rebuild_stats(db_path)
+
+
+def rebuild_stats(db_path=DB_PATH):
+    """Recount Admission_Stats from scratch (one full scan)"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM Admission_Stats")
+    cursor.execute(f"""
+        INSERT INTO Admission_Stats (Stream, Validation_Status, Result_Status, Applicants,
+                                     Pending_Validation_Emails, Pending_Result_Emails)
+        SELECT IFNULL(a.Stream_Applied, ''), {_validation("a")}, {_result("r")}, COUNT(*),
+               SUM({_pending_validation_email("a")}), SUM({_pending_result_email("r")})
+        FROM Application_Data a LEFT JOIN Admission_Results r ON r.Email = a.Email
+        GROUP BY 1, 2, 3
+    """)
+    conn.commit()
+    conn.close()
+
+
+# ----------------- DASHBOARD QUERIES -----------------
+def _stats_filter(stream=None, validation=None, result=None):
+    clauses, params = [], []
+    for column, value in (("Stream", stream), ("Validation_Status", validation), ("Result_Status", result)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+@metrics.timed("admission_admin_query_seconds", "Admin dashboard query latency", op="summary")
+def fetch_summary(db_path=DB_PATH):
+    """Headline counters and per-stream rows, all from Admission_Stats / Admission_Seats"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT Stream,
+               SUM(Applicants),
+               SUM(CASE WHEN Validation_Status != 'pending' THEN Applicants ELSE 0 END),
+               SUM(CASE WHEN Validation_Status = 'valid' THEN Applicants ELSE 0 END),
+               SUM(CASE WHEN Result_Status != 'none' THEN Applicants ELSE 0 END),
+               SUM(CASE WHEN Result_Status = 'accepted' THEN Applicants ELSE 0 END),
+               SUM(Pending_Validation_Emails + Pending_Result_Emails)
+        FROM Admission_Stats GROUP BY Stream ORDER BY Stream
+    """)
+    streams = {
+        stream: {"Applications": n, "Validated": validated, "Valid": valid, "Shortlisted": shortlisted,
+                 "Accepted": accepted, "Pending emails": pending}
+        for stream, n, validated, valid, shortlisted, accepted, pending in cursor.fetchall()
+    }
+    cursor.execute("SELECT Stream, Total_Seats, Available_Seats FROM Admission_Seats ORDER BY Stream")
+    seats = {stream: (total, available) for stream, total, available in cursor.fetchall()}
+    conn.close()
+
+    for stream in seats.keys() | streams.keys():
+        row = streams.setdefault(stream, {"Applications": 0, "Validated": 0, "Valid": 0, "Shortlisted": 0,
+                                          "Accepted": 0, "Pending emails": 0})
+        total, available = seats.get(stream, (None, None))
+        row["Seats"] = total
+        row["Seats left"] = available
+    totals = {key: sum(row[key] or 0 for row in streams.values())
+              for key in ("Applications", "Validated", "Valid", "Shortlisted", "Accepted", "Pending emails",
+                          "Seats", "Seats left")}
+    return totals, [dict(Stream=stream or "(none)", **streams[stream]) for stream in sorted(streams)]
+
+
+@metrics.timed("admission_admin_query_seconds", "Admin dashboard query latency", op="count")
+def count_applicants(stream=None, validation=None, result=None, db_path=DB_PATH):
+    where, params = _stats_filter(stream, validation, result)
+    conn = sqlite3.connect(db_path)
+    count = conn.execute(f"SELECT IFNULL(SUM(Applicants), 0) FROM Admission_Stats{where}", params).fetchone()[0]
+    conn.close()
+    return count
+
+
+@metrics.timed("admission_admin_query_seconds", "Admin dashboard query latency", op="page")
+def fetch_applicants(stream=None, validation=None, result=None, order="email", after=None, limit=50,
+                     db_path=DB_PATH):
+    """One page of applicants after the keyset cursor `after`.
+
+    Returns (rows, cursor_for_next_page); the cursor is None on the last page.
+    """
+    keys = PAGE_ORDERS[order]
+    # an empty filter would otherwise walk the whole table looking for a first match
+    if not count_applicants(stream, validation, result, db_path):
+        return [], None
+    clauses, params = [], []
+    if stream is not None:
+        clauses.append("a.Stream_Applied = ?")
+        params.append(stream)
+    if validation is not None:
+        clauses.append(VALIDATION_FILTERS[validation])
+    if result is not None:
+        clauses.append(RESULT_FILTERS[result])
+    if after is not None:
+        clauses.append(f"({', '.join(keys)}) > ({', '.join('?' * len(keys))})")
+        params.extend(after)
+    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT a.Email, p.Name, a.Stream_Applied, a.JEE_Rank, {_validation('a')}, {_result('r')},
+               r.Allocated_Stream, a.validation_attempts, a.error_observed
+        FROM Application_Data a
+        JOIN Primary_Data p ON p.Email = a.Email
+        LEFT JOIN Admission_Results r ON r.Email = a.Email
+        {where}
+        ORDER BY {', '.join(keys)}
+        LIMIT ?
+    """, params + [limit + 1])
+    fetched = cursor.fetchall()
+    conn.close()
+
+    rows = [
+        {"Email": email, "Name": name, "Stream": stream, "JEE Rank": rank, "Validation": validation_status,
+         "Result": result_status, "Allocated": allocated, "Attempts": attempts, "Issues": issues}
+        for email, name, stream, rank, validation_status, result_status, allocated, attempts, issues
+        in fetched[:limit]
+    ]
+    next_cursor = None
+    if len(fetched) > limit:
+        last = rows[-1]
+        if order == "email":
+            next_cursor = (last["Email"],)
+        else:
+            next_cursor = (UNRANKED if last["JEE Rank"] is None else last["JEE Rank"], last["Email"])
+    return rows, next_cursor
+
+
+if __name__ == "__main__":
+    init_admin_stats()
+    rebuild_stats()
+    totals, _ = fetch_summary()
+    print(f"✅ Admission_Stats rebuilt: {totals['Applications']} applications, "
+          f"{totals['Pending emails']} pending emails.")
+
+
+@metrics.timed("admission_admin_query_seconds", "Admin dashboard query latency", op="duplicates")
+def fetch_duplicate_flags(limit=200, db_path=DB_PATH):
+    """Newest duplicate-document flags for manual review, with both applicants' names"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM Duplicate_Document_Flags")
+    total = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT f.Email, p.Name, f.Document_Type, f.Matched_Email, m.Name,
+               f.Text_Similarity, f.Image_Distance, f.Flagged_At
+        FROM Duplicate_Document_Flags f
+        LEFT JOIN Primary_Data p ON p.Email = f.Email
+        LEFT JOIN Primary_Data m ON m.Email = f.Matched_Email
+        ORDER BY f.Flagged_At DESC, f.Email
+        LIMIT ?
+    """, (limit,))
+    rows = [
+        {"Email": email, "Name": name, "Document": doc_type, "Matches": matched, "Matched name": matched_name,
+         "Text similarity": None if similarity is None else round(similarity, 2),
+         "Image distance": distance, "Flagged at": flagged_at}
+        for email, name, doc_type, matched, matched_name, similarity, distance, flagged_at in cursor.fetchall()
+    ]
+    conn.close()
+    return total, rows
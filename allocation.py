@@ -0,0 +1,323 @@
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+
+from config import DB_PATH
+
+# -------------------------
+# Multi-round counselling allocation
+# -------------------------
+# Every stream ranks applicants the same way (JEE rank), so applicant-proposing
+# deferred acceptance reduces to serial dictatorship: walk applicants in merit
+# order and give each their most preferred stream that still has a seat. That
+# is O(applicants x preferences) and produces the same stable matching.
+#
+# Across rounds an applicant keeps the seat they already hold as a floor. Held
+# seats stay reserved until their holder is reached in merit order, at which
+# point the holder may "float" up to a better preference (freeing the old seat
+# for everyone ranked below) or stay put if they chose to "freeze".
+
+FLOAT = "float"
+FREEZE = "freeze"
+WITHDRAWN = "withdrawn"
+
+
+def _add_column(cursor, table, column, definition):
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def init_allocation_tables(db_path=DB_PATH):
+    """Create preference / allocation tables and extend Admission_Results"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Stream_Preferences (
+        Email TEXT NOT NULL,
+        Preference_Rank INTEGER NOT NULL,
+        Stream VARCHAR(100) NOT NULL,
+        PRIMARY KEY (Email, Preference_Rank),
+        FOREIGN KEY (Email) REFERENCES Primary_Data(Email)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Seat_Allocations (
+        Email TEXT PRIMARY KEY,
+        Stream VARCHAR(100),
+        Preference_Rank INTEGER,
+        Round_No INTEGER,
+        Status VARCHAR(20) DEFAULT 'float',  -- float / freeze / withdrawn
+        Updated_At TIMESTAMP,
+        FOREIGN KEY (Email) REFERENCES Primary_Data(Email)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Counselling_Rounds (
+        Round_No INTEGER PRIMARY KEY,
+        Run_At TIMESTAMP,
+        Allocated INTEGER,
+        Upgraded INTEGER,
+        Duration_Seconds FLOAT
+    )
+    """)
+    _add_column(cursor, "Admission_Results", "Allocated_Stream", "VARCHAR(100)")
+    _add_column(cursor, "Admission_Results", "Allocation_Round", "INTEGER")
+    conn.commit()
+    conn.close()
+
+
+# -------------------------
+# Preferences
+# -------------------------
+def set_preferences(email, streams, db_path=DB_PATH):
+    """Replace an applicant's ranked stream list (first entry = first choice)"""
+    ordered = list(dict.fromkeys(s for s in streams if s))
+    conn = sqlite3.connect(db_path, timeout=30)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM Stream_Preferences WHERE Email=?", (email,))
+    cursor.executemany("INSERT INTO Stream_Preferences (Email, Preference_Rank, Stream) VALUES (?, ?, ?)",
+                       [(email, rank, stream) for rank, stream in enumerate(ordered, start=1)])
+    conn.commit()
+    conn.close()
+
+
+def get_preferences(email, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT Stream FROM Stream_Preferences WHERE Email=? ORDER BY Preference_Rank", (email,))
+    streams = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return streams
+
+
+# -------------------------
+# Core algorithm
+# -------------------------
+def allocate(applicants, capacity, held):
+    """Allocate one round.
+
+    applicants: [(email, [stream, ...])] sorted best merit first
+    capacity:   {stream: total seats}
+    held:       {email: (stream, status)} seats carried over from earlier rounds
+    Returns {email: (stream, preference_rank)}.
+    """
+    remaining = dict(capacity)
+    for stream, status in held.values():
+        remaining[stream] = remaining.get(stream, 0) - 1
+
+    result = {}
+    for email, prefs in applicants:
+        current = held.get(email)
+        if current is not None:
+            stream, status = current
+            remaining[stream] += 1
+            if status == FREEZE or stream not in prefs:
+                choices = [stream]
+            else:
+                choices = prefs[:prefs.index(stream) + 1]
+        else:
+            choices = prefs
+        for stream in choices:
+            if remaining.get(stream, 0) > 0:
+                remaining[stream] -= 1
+                result[email] = (stream, prefs.index(stream) + 1 if stream in prefs else None)
+                break
+    return result
+
+
+# -------------------------
+# Rounds
+# -------------------------
+def release_seat(cursor, email):
+    """Take back any seat an applicant holds and reset their result to not accepted.
+
+    Used for withdrawals, for applicants who are no longer eligible, and for
+    edited applications; the caller commits.
+    """
+    cursor.execute("SELECT Stream FROM Seat_Allocations WHERE Email=?", (email,))
+    row = cursor.fetchone()
+    if row is not None and row[0] is not None:
+        cursor.execute("UPDATE Admission_Seats SET Available_Seats = Available_Seats + 1 WHERE Stream=?", (row[0],))
+    cursor.execute("UPDATE Seat_Allocations SET Stream=NULL, Preference_Rank=NULL WHERE Email=?", (email,))
+    cursor.execute("""
+        UPDATE Admission_Results SET acceptance_status=FALSE, Allocated_Stream=NULL,
+            acceptance_status_email_sent=FALSE
+        WHERE Email=?
+    """, (email,))
+
+
+def load_round_inputs(cursor):
+    cursor.execute("SELECT Stream, Total_Seats FROM Admission_Seats")
+    capacity = dict(cursor.fetchall())
+
+    prefs = {}
+    cursor.execute("SELECT Email, Stream FROM Stream_Preferences ORDER BY Email, Preference_Rank")
+    for email, stream in cursor.fetchall():
+        prefs.setdefault(email, []).append(stream)
+
+    cursor.execute("""
+        SELECT a.Email, a.Stream_Applied FROM Application_Data a
+        LEFT JOIN Seat_Allocations s ON s.Email = a.Email
+        WHERE a.application_valid = TRUE AND a.JEE_Rank > 0
+          AND (s.Status IS NULL OR s.Status != 'withdrawn')
+        ORDER BY a.JEE_Rank, a.Email
+    """)
+    applicants = [(email, prefs.get(email) or [stream]) for email, stream in cursor.fetchall()]
+
+    cursor.execute("SELECT Email, Stream, Status FROM Seat_Allocations WHERE Stream IS NOT NULL AND Status != 'withdrawn'")
+    held = {email: (stream, status) for email, stream, status in cursor.fetchall()}
+    return applicants, capacity, held
+
+
+def run_round(db_path=DB_PATH):
+    """Compute the next counselling round and write it back. Returns the round summary."""
+    start = time.time()
+    init_allocation_tables(db_path)
+    conn = sqlite3.connect(db_path, timeout=30)
+    cursor = conn.cursor()
+    applicants, capacity, held = load_round_inputs(cursor)
+    eligible = {email for email, _ in applicants}
+    held = {email: seat for email, seat in held.items() if email in eligible}
+    result = allocate(applicants, capacity, held)
+
+    # seats still recorded for applicants who dropped out of the running
+    # (invalidated after an edit or re-validation, rank cleared) go back
+    cursor.execute("""
+        SELECT Email FROM Seat_Allocations WHERE Stream IS NOT NULL
+        UNION
+        SELECT Email FROM Admission_Results WHERE Allocated_Stream IS NOT NULL OR acceptance_status = TRUE
+    """)
+    released = [email for (email,) in cursor.fetchall() if email not in eligible]
+    for email in released:
+        release_seat(cursor, email)
+
+    # valid applicants left out of the round (no JEE rank, withdrawn) are
+    # decided as not allocated, so they are notified and the round closes
+    cursor.execute("""
+        SELECT r.Email FROM Admission_Results r JOIN Application_Data a ON a.Email = r.Email
+        WHERE a.application_valid = TRUE AND r.shortlisting_done = FALSE
+    """)
+    excluded = [email for (email,) in cursor.fetchall() if email not in eligible]
+
+    cursor.execute("SELECT COALESCE(MAX(Round_No), 0) + 1 FROM Counselling_Rounds")
+    round_no = cursor.fetchone()[0]
+    now = datetime.now()
+
+    cursor.execute("""
+        SELECT r.Email, r.shortlisting_done, r.Allocated_Stream FROM Admission_Results r
+        JOIN Application_Data a ON a.Email = r.Email WHERE a.application_valid = TRUE
+    """)
+    previous = {email: (done, stream) for email, done, stream in cursor.fetchall()}
+
+    # only rows whose outcome changed are written, so re-runs after a few
+    # withdrawals touch a handful of rows rather than the whole cohort
+    seat_rows, result_rows = [], []
+    upgraded = 0
+    for email in eligible:
+        stream, rank = result.get(email, (None, None))
+        done, old_stream = previous.get(email, (False, None))
+        if done and old_stream == stream:
+            continue
+        if old_stream is not None and stream is not None:
+            upgraded += 1
+        seat_rows.append((email, stream, rank, round_no, now))
+        result_rows.append((email, stream is not None, stream, round_no))
+
+    cursor.executemany("""
+        INSERT INTO Seat_Allocations (Email, Stream, Preference_Rank, Round_No, Updated_At)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(Email) DO UPDATE SET
+            Stream=excluded.Stream, Preference_Rank=excluded.Preference_Rank,
+            Round_No=excluded.Round_No, Updated_At=excluded.Updated_At
+    """, seat_rows)
+    cursor.executemany("""
+        INSERT INTO Admission_Results (Email, shortlisting_done, acceptance_status, Allocated_Stream, Allocation_Round)
+        VALUES (?, TRUE, ?, ?, ?)
+        ON CONFLICT(Email) DO UPDATE SET
+            shortlisting_done=TRUE, acceptance_status=excluded.acceptance_status,
+            Allocated_Stream=excluded.Allocated_Stream, Allocation_Round=excluded.Allocation_Round,
+            acceptance_status_email_sent=FALSE
+    """, [(email, accepted, stream, round_no) for email, accepted, stream, round_no in result_rows])
+    cursor.executemany("""
+        UPDATE Admission_Results SET shortlisting_done=TRUE, acceptance_status=FALSE, Allocated_Stream=NULL,
+            Allocation_Round=?, acceptance_status_email_sent=FALSE
+        WHERE Email=?
+    """, [(round_no, email) for email in excluded])
+
+    taken = {}
+    for stream, _ in result.values():
+        taken[stream] = taken.get(stream, 0) + 1
+    cursor.executemany("UPDATE Admission_Seats SET Available_Seats = Total_Seats - ? WHERE Stream=?",
+                       [(taken.get(stream, 0), stream) for stream in capacity])
+
+    duration = time.time() - start
+    cursor.execute("INSERT INTO Counselling_Rounds (Round_No, Run_At, Allocated, Upgraded, Duration_Seconds) VALUES (?, ?, ?, ?, ?)",
+                   (round_no, now, len(result), upgraded, duration))
+    conn.commit()
+    conn.close()
+    return {"round": round_no, "applicants": len(applicants), "allocated": len(result),
+            "changed": len(result_rows), "upgraded": upgraded, "released": len(released),
+            "excluded": len(excluded), "seconds": round(duration, 2)}
+
+
+def round_pending(db_path=DB_PATH):
+    """True when there are undecided applicants or seats released since the last round"""
+    init_allocation_tables(db_path)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT EXISTS (
+            SELECT 1 FROM Application_Data a JOIN Admission_Results r ON r.Email = a.Email
+            WHERE a.application_valid = TRUE AND r.shortlisting_done = FALSE
+        ) OR EXISTS (
+            SELECT 1 FROM Seat_Allocations
+            WHERE Status = 'withdrawn'
+              AND Updated_At > (SELECT COALESCE(MAX(Run_At), '') FROM Counselling_Rounds)
+        ) OR EXISTS (
+            SELECT 1 FROM Seat_Allocations s JOIN Application_Data a ON a.Email = s.Email
+            WHERE s.Stream IS NOT NULL AND NOT (a.application_valid = TRUE AND a.JEE_Rank > 0)
+        )
+    """)
+    pending = bool(cursor.fetchone()[0])
+    conn.close()
+    return pending
+
+
+def set_seat_choice(email, status, db_path=DB_PATH):
+    """Mark a held seat as float / freeze, or withdraw and release it"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    cursor = conn.cursor()
+    cursor.execute("SELECT Email FROM Primary_Data WHERE Email=?", (email,))
+    if cursor.fetchone() is None:
+        conn.close()
+        return False
+    if status == WITHDRAWN:
+        release_seat(cursor, email)
+    cursor.execute("""
+        INSERT INTO Seat_Allocations (Email, Status, Updated_At) VALUES (?, ?, ?)
+        ON CONFLICT(Email) DO UPDATE SET Status=excluded.Status, Updated_At=excluded.Updated_At
+    """, (email, status, datetime.now()))
+    conn.commit()
+    conn.close()
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Counselling seat allocation")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("round", help="run the next counselling round")
+    for name in (FLOAT, FREEZE, WITHDRAWN):
+        sub.add_parser(name, help=f"mark an applicant's seat as {name}").add_argument("email")
+    args = parser.parse_args()
+
+    if args.command == "round":
+        summary = run_round()
+        print(f"✅ Round {summary['round']}: {summary['allocated']}/{summary['applicants']} allocated, "
+              f"{summary['changed']} changed, {summary['upgraded']} upgraded, "
+              f"{summary['released']} released in {summary['seconds']}s")
+    elif set_seat_choice(args.email, args.command):
+        print(f"✅ {args.email} marked {args.command}")
+    else:
+        print(f"❌ No applicant found for {args.email}")
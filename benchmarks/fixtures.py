@@ -0,0 +1,232 @@
+import hashlib
+import io
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+from PIL import Image, ImageDraw, ImageFont
+
+# -------------------------
+# Synthetic fixtures for benchmarks and load tests (no network, no real data)
+# -------------------------
+STREAMS = ["CS", "ECE", "Mechanical", "Civil"]
+FIRST_NAMES = ["Asha", "Bimal", "Chandra", "Deepa", "Esha", "Farhan", "Gita", "Hari", "Indra", "Jaya"]
+LAST_NAMES = ["Roy", "Das", "Sen", "Ghosh", "Bose", "Paul", "Mitra", "Saha", "Dutta", "Kar"]
+
+
+class UploadedPDF(io.BytesIO):
+    """Stands in for Streamlit's UploadedFile (a BytesIO with a name)"""
+
+    def __init__(self, data, name="document.pdf"):
+        super().__init__(data)
+        self.name = name
+
+
+# -------------------------
+# Applicants
+# -------------------------
+def synthetic_applicant(i, rng=None):
+    """Form values for applicant i, in upsert_student_data argument order"""
+    rng = rng or random.Random(i)
+    return {
+        "email": f"student{i:06d}@example.com",
+        "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "mobile": f"9{i:09d}",
+        "aadhar": f"{rng.randrange(10**11, 10**12)}",
+        "dob": date(2006, 1, 1) + timedelta(days=rng.randrange(730)),
+        "class_10_year": 2022,
+        "class_10_marks": round(rng.uniform(60, 99), 1),
+        "class_12_year": 2024,
+        "class_12_physics": round(rng.uniform(50, 99), 1),
+        "class_12_maths": round(rng.uniform(50, 99), 1),
+        "class_12_chemistry": round(rng.uniform(50, 99), 1),
+        "jee_year": 2025,
+        "jee_rank": rng.randrange(1, 1_000_000),
+        "stream": rng.choice(STREAMS),
+    }
+
+
+def populate_applicants(db_path, count, start=0):
+    """Bulk-insert synthetic applicants straight into admissions.db"""
+    rows = [synthetic_applicant(i) for i in range(start, start + count)]
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.executemany("INSERT OR IGNORE INTO Login_Credentials VALUES (?, ?)",
+                       [(r["email"], hashlib.sha256(b"password").hexdigest()) for r in rows])
+    cursor.executemany("INSERT OR IGNORE INTO Primary_Data (Email, Name, Mobile_Number) VALUES (?, ?, ?)",
+                       [(r["email"], r["name"], r["mobile"]) for r in rows])
+    cursor.executemany("""
+        INSERT OR IGNORE INTO Application_Data (
+            Email, Aadhar_Number, DOB, Class_10_Year, Class_10_Avg_Marks, Class_12_Year,
+            Class_12_Physics, Class_12_Maths, Class_12_Chemistry, JEE_Year, JEE_Rank, Stream_Applied
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(r["email"], r["aadhar"], r["dob"].isoformat(), r["class_10_year"], r["class_10_marks"],
+           r["class_12_year"], r["class_12_physics"], r["class_12_maths"], r["class_12_chemistry"],
+           r["jee_year"], r["jee_rank"], r["stream"]) for r in rows])
+    cursor.executemany("INSERT OR IGNORE INTO Admission_Results (Email) VALUES (?)", [(r["email"],) for r in rows])
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def document_lines(applicant, doc_type):
+    """Text a genuine document of this type would carry"""
+    name = applicant["name"].upper()
+    if doc_type == "aadhar_card":
+        return ["GOVERNMENT OF INDIA", name, f"DOB: {applicant['dob'].strftime('%d/%m/%Y')}",
+                f"{applicant['aadhar'][:4]} {applicant['aadhar'][4:8]} {applicant['aadhar'][8:]}"]
+    if doc_type == "class_10_marksheet":
+        return ["SECONDARY EXAMINATION", name, f"YEAR {applicant['class_10_year']}",
+                f"AVERAGE {applicant['class_10_marks']}"]
+    if doc_type == "class_12_marksheet":
+        return ["HIGHER SECONDARY EXAMINATION", name, f"YEAR {applicant['class_12_year']}",
+                f"PHYSICS {applicant['class_12_physics']}", f"MATHEMATICS {applicant['class_12_maths']}",
+                f"CHEMISTRY {applicant['class_12_chemistry']}"]
+    return ["JOINT ENTRANCE EXAMINATION", name, f"JEE {applicant['jee_year']}",
+            f"ALL INDIA RANK {applicant['jee_rank']}"]
+
+
+# -------------------------
+# PDFs
+# -------------------------
+def _font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1 only ships the small bitmap font
+        return ImageFont.load_default()
+
+
+def make_scanned_pdf(lines, pages=1, dpi=150):
+    """Image-only PDF, like a phone scan: each page is a rendered bitmap of the text"""
+    images = []
+    font = _font(36)
+    for page in range(pages):
+        img = Image.new("L", (int(8.27 * dpi), int(11.69 * dpi)), 255)
+        draw = ImageDraw.Draw(img)
+        y = 120
+        for line in lines + [f"Page {page + 1}"]:
+            draw.text((100, y), line, fill=0, font=font)
+            y += 70
+        images.append(img.convert("RGB"))
+    buffer = io.BytesIO()
+    images[0].save(buffer, format="PDF", save_all=True, append_images=images[1:], resolution=dpi)
+    return buffer.getvalue()
+
+
+def make_text_pdf(lines, pages=1):
+    """Minimal PDF with a real text layer (Helvetica), written by hand"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        ops = ["BT", "/F1 18 Tf", "72 760 Td", "24 TL"]
+        for line in lines + [f"Page {page + 1}"]:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({escaped}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops)
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+# -------------------------
+# Offline stand-ins for external services
+# -------------------------
+class HashEmbeddingFunction:
+    """Deterministic bag-of-words embedding so Chroma writes can be measured without the ONNX model"""
+
+    def __init__(self, dimensions=384):
+        self.dimensions = dimensions
+
+    def __call__(self, input):
+        embeddings = []
+        for text in input:
+            vector = [0.0] * self.dimensions
+            for token in text.lower().split():
+                vector[int(hashlib.md5(token.encode()).hexdigest(), 16) % self.dimensions] += 1.0
+            norm = sum(v * v for v in vector) ** 0.5 or 1.0
+            embeddings.append([v / norm for v in vector])
+        return embeddings
+
+
+class StubGmailService:
+    """Mimics service.users().messages().send(userId=..., body=...).execute()"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.sent = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def send(self, userId, body):
+        self._pending = body
+        return self
+
+    def execute(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.sent.append(self._pending)
+        return {"id": f"stub-{len(self.sent)}"}
+
+
+def stub_email_body(student, latency=0.0):
+    """Template reply in place of the CrewAI / OpenAI call"""
+    if latency:
+        time.sleep(latency)
+    issues = f" Issues: {', '.join(student['issues'])}." if student["issues"] else ""
+    return (f"Dear applicant,\n\nYour application status is {student['status']}.{issues}\n\n"
+            "Admission Cell\nIEM Kolkata")
+
+
+# -------------------------
+# Workspace
+# -------------------------
+def make_workspace(applicants=0, prefix="admission-bench-"):
+    """Fresh admissions.db + vector_db in a temp dir (the cwd from here on), with synthetic applicants.
+
+    Must run before anything imports config, since the paths are read at import time.
+    Returns (workspace, portal_backend) with Chroma writes going through HashEmbeddingFunction.
+    """
+    workspace = tempfile.mkdtemp(prefix=prefix)
+    os.chdir(workspace)
+    os.makedirs("database")
+    os.environ["ADMISSIONS_DB_PATH"] = os.path.join(workspace, "database", "admissions.db")
+    os.environ["VECTOR_DB_PATH"] = os.path.join(workspace, "vector_db")
+
+    import main
+    main.init_sql_db()
+    if applicants:
+        populate_applicants(os.environ["ADMISSIONS_DB_PATH"], applicants)
+
+    import portal_backend
+    portal_backend.init_login_db()
+    # offline embeddings for the document path; the ONNX model is measured on its own
+    portal_backend.collection = portal_backend.get_chroma_client().get_or_create_collection(
+        name="bench_documents", embedding_function=HashEmbeddingFunction()
+    )
+    portal_backend.report_error = lambda message: None
+    return workspace, portal_backend
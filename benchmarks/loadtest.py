@@ -0,0 +1,414 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# -------------------------
+# Deadline-rush load test for the student portal
+# -------------------------
+# N simulated students arrive as a Poisson process and each walks through
+# signup -> login -> form load -> submit -> upload -> resubmit, against a
+# throw-away workspace. Usage:
+#
+#   python benchmarks/loadtest.py --students 200 --arrival-rate 20
+#   python benchmarks/loadtest.py --students 500 --arrival-rate 50 --uploads text --resubmits 2
+#   python benchmarks/loadtest.py --driver apptest --students 20     # through login_app.py itself
+#
+# The backend driver calls portal_backend directly, one thread per active
+# session just like the Streamlit server. The apptest driver renders
+# login_app.py with streamlit.testing and clicks through the real pages.
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+
+import fixtures  # noqa: E402
+
+STEPS = ["signup", "login", "form_load", "submit", "upload", "resubmit"]
+PASSWORD = "deadline-rush"
+
+
+class Recorder:
+    """Latencies and failures per step, shared by all simulated sessions"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {step: [] for step in STEPS}
+        self.errors = {step: 0 for step in STEPS}
+        self.locked = {step: 0 for step in STEPS}
+        self.samples = {}  # first message per error type
+        self.completed = 0
+        self._session = threading.local()  # step each session thread is in
+
+    @property
+    def current_step(self):
+        """Step the calling session entered last (errors between steps count against it)"""
+        return getattr(self._session, "step", STEPS[0])
+
+    def step(self, name, fn, *args, **kwargs):
+        self._session.step = name
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.fail(name, e)
+            return None
+        with self.lock:
+            self.latencies[name].append(time.perf_counter() - start)
+        return result
+
+    def fail(self, name, error):
+        message = str(error)
+        with self.lock:
+            # the apptest driver only sees the message, re-raised from the page
+            if "database is locked" in message:
+                self.locked[name] += 1
+            else:
+                self.errors[name] += 1
+            self.samples.setdefault(type(error).__name__, message[:200])
+
+    def export(self):
+        return {"latencies": self.latencies, "errors": self.errors, "locked": self.locked,
+                "samples": self.samples, "completed": self.completed}
+
+    def merge(self, data):
+        with self.lock:
+            for step in STEPS:
+                self.latencies[step] += data["latencies"][step]
+                self.errors[step] += data["errors"][step]
+                self.locked[step] += data["locked"][step]
+            for kind, message in data["samples"].items():
+                self.samples.setdefault(kind, message)
+            self.completed += data["completed"]
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+# -------------------------
+# Drivers
+# -------------------------
+class BackendDriver:
+    """Calls the portal's data functions the way one Streamlit session would"""
+    in_processes = False
+
+    def __init__(self, backend, args):
+        import allocation
+        self.backend = backend
+        self.allocation = allocation
+        self.args = args
+
+    def _pdfs(self, applicant):
+        if self.args.uploads == "none":
+            return [None] * len(self.backend.DOC_TYPES)
+        make = fixtures.make_text_pdf if self.args.uploads == "text" else fixtures.make_scanned_pdf
+        return [fixtures.UploadedPDF(make(fixtures.document_lines(applicant, d)), f"{d}.pdf")
+                for d in self.backend.DOC_TYPES]
+
+    def _submit(self, applicant, files):
+        self.backend.upsert_student_data(**applicant)
+        self.allocation.set_preferences(applicant["email"], [applicant["stream"]], self.backend.DATA_DB_PATH)
+        self.backend.update_documents(applicant["email"], files)
+
+    def journey(self, applicant, recorder, rng):
+        b = self.backend
+        email = applicant["email"]
+        if not recorder.step("signup", b.add_user, email, PASSWORD):
+            return False
+        think(rng, self.args)
+        if not recorder.step("login", b.verify_user, email, PASSWORD):
+            return False
+        recorder.step("form_load", b.fetch_student_data, email)
+        think(rng, self.args)
+        # form fields first, documents second, so their latencies can be told apart
+        recorder.step("submit", self._submit, applicant, [None] * len(b.DOC_TYPES))
+        files = self._pdfs(applicant)
+        if any(files):
+            recorder.step("upload", b.update_documents, email, files)
+        for n in range(self.args.resubmits):
+            think(rng, self.args)
+            recorder.step("form_load", b.fetch_student_data, email)
+            applicant = dict(applicant, jee_rank=applicant["jee_rank"] + n + 1)
+            # same files again: the unchanged-document shortcut should make this cheap
+            files = [fixtures.UploadedPDF(f.getvalue(), f.name) if f else None for f in files]
+            recorder.step("resubmit", self._submit, applicant, files)
+        return True
+
+
+class AppTestDriver:
+    """Clicks through login_app.py with Streamlit's in-process testing harness.
+
+    AppTest drives a process-wide Streamlit runtime, so each simulated session
+    runs in its own forked worker process rather than a thread.
+    """
+    in_processes = True
+
+    def __init__(self, backend, args):
+        from streamlit.testing.v1 import AppTest
+        self.AppTest = AppTest
+        self.args = args
+        self.script = str(REPO_ROOT / "login_app.py")
+
+    @staticmethod
+    def _widget(elements, label):
+        for element in elements:
+            if element.label == label:
+                return element
+        raise LookupError(f"No widget labelled {label!r} on the page")
+
+    def _run(self, at):
+        at.run(timeout=self.args.apptest_timeout)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        return at
+
+    def _click(self, at, label):
+        self._widget(at.button, label).click()
+        return self._run(at)
+
+    def journey(self, applicant, recorder, rng):
+        email = applicant["email"]
+        at = recorder.step("form_load", lambda: self._run(
+            self.AppTest.from_file(self.script, default_timeout=self.args.apptest_timeout)))
+        if at is None:
+            return False
+
+        def signup():
+            self._click(at, "Sign up")
+            self._run(at)  # the Sign up button sets the page without st.rerun(), so it shows on the next run
+            self._widget(at.text_input, "Email").input(email)
+            self._widget(at.text_input, "Password").input(PASSWORD)
+            self._widget(at.text_input, "Confirm Password").input(PASSWORD)
+            self._click(at, "Create Account")
+            if at.session_state.page != "login":
+                raise RuntimeError("signup did not return to the login page")
+            return True
+
+        def login():
+            self._widget(at.text_input, "Email").input(email)
+            self._widget(at.text_input, "Password").input(PASSWORD)
+            self._click(at, "Login")
+            if at.session_state.page != "form":
+                raise RuntimeError("login was rejected")
+            return True
+
+        def submit(values):
+            self._widget(at.text_input, "Full Name").input(values["name"])
+            self._widget(at.text_input, "Mobile Number").input(values["mobile"])
+            self._widget(at.text_input, "Aadhar Number").input(values["aadhar"])
+            self._widget(at.date_input, "Date of Birth").set_value(values["dob"])
+            self._widget(at.number_input, "Class 10 Year").set_value(values["class_10_year"])
+            self._widget(at.number_input, "Class 10 Avg Marks (%)").set_value(values["class_10_marks"])
+            self._widget(at.number_input, "Class 12 Year").set_value(values["class_12_year"])
+            self._widget(at.number_input, "Class 12 Physics (%)").set_value(values["class_12_physics"])
+            self._widget(at.number_input, "Class 12 Maths (%)").set_value(values["class_12_maths"])
+            self._widget(at.number_input, "Class 12 Chemistry (%)").set_value(values["class_12_chemistry"])
+            self._widget(at.number_input, "JEE Year").set_value(values["jee_year"])
+            self._widget(at.number_input, "JEE Rank").set_value(values["jee_rank"])
+            self._widget(at.selectbox, "Stream Applied").set_value(values["stream"])
+            self._click(at, "Submit / Update Application")
+            if not any("submitted" in element.value for element in at.success):
+                raise RuntimeError("form submission did not report success")
+            return True
+
+        if recorder.step("signup", signup) is None:
+            return False
+        think(rng, self.args)
+        if recorder.step("login", login) is None:
+            return False
+        think(rng, self.args)
+        recorder.step("submit", submit, applicant)
+        # st.file_uploader cannot be driven by the testing harness, so documents are not uploaded here
+        for n in range(self.args.resubmits):
+            think(rng, self.args)
+            recorder.step("resubmit", submit, dict(applicant, jee_rank=applicant["jee_rank"] + n + 1))
+        return True
+
+
+DRIVERS = {"backend": BackendDriver, "apptest": AppTestDriver}
+
+
+def think(rng, args):
+    if args.think_time:
+        time.sleep(rng.expovariate(1 / args.think_time))
+
+
+# -------------------------
+# Run
+# -------------------------
+def _session(driver, applicant, recorder, seed):
+    try:
+        if driver.journey(applicant, recorder, random.Random(seed)):
+            with recorder.lock:
+                recorder.completed += 1
+    except Exception as e:
+        recorder.fail(recorder.current_step, e)
+
+
+_worker_driver = None  # set in each forked worker by _init_worker
+
+
+def _init_worker(driver):
+    global _worker_driver
+    _worker_driver = driver
+
+
+def _process_session(applicant, seed):
+    recorder = Recorder()
+    _session(_worker_driver, applicant, recorder, seed)
+    return recorder.export()
+
+
+def run_load(driver, args):
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    applicants = [fixtures.synthetic_applicant(args.applicants + i) for i in range(args.students)]
+    # Poisson arrivals: exponential gaps at the requested rate
+    arrivals, t = [], 0.0
+    for _ in applicants:
+        arrivals.append(t)
+        t += rng.expovariate(args.arrival_rate) if args.arrival_rate else 0.0
+
+    concurrency = args.concurrency or args.students
+    if driver.in_processes:
+        # AppTest swaps __main__ for the app script inside the worker, so the
+        # worker functions must be pickled by their importable module name
+        import loadtest
+        pool = ProcessPoolExecutor(max_workers=min(concurrency, os.cpu_count() * 4),
+                                   mp_context=multiprocessing.get_context("fork"),
+                                   initializer=loadtest._init_worker, initargs=(driver,))
+    else:
+        pool = ThreadPoolExecutor(max_workers=concurrency)
+
+    start = time.perf_counter()
+    with pool:
+        futures = []
+        for i, at in enumerate(arrivals):
+            delay = at - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+            if driver.in_processes:
+                futures.append(pool.submit(loadtest._process_session, applicants[i], args.seed + i))
+            else:
+                pool.submit(_session, driver, applicants[i], recorder, args.seed + i)
+        for future in futures:
+            recorder.merge(future.result())
+    return recorder, time.perf_counter() - start
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def report(recorder, elapsed, args):
+    steps = {}
+    for step in STEPS:
+        values = recorder.latencies[step]
+        if not values and not recorder.errors[step] and not recorder.locked[step]:
+            continue
+        steps[step] = {
+            "count": len(values),
+            "errors": recorder.errors[step],
+            "locked": recorder.locked[step],
+            "p50_ms": _ms(percentile(values, 0.50)),
+            "p95_ms": _ms(percentile(values, 0.95)),
+            "p99_ms": _ms(percentile(values, 0.99)),
+            "max_ms": _ms(max(values, default=None)),
+        }
+    operations = sum(s["count"] for s in steps.values())
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "driver": args.driver,
+        "parameters": {"students": args.students, "arrival_rate": args.arrival_rate,
+                       "concurrency": args.concurrency or args.students, "resubmits": args.resubmits,
+                       "uploads": args.uploads, "think_time": args.think_time,
+                       "preloaded_applicants": args.applicants},
+        "elapsed_s": round(elapsed, 2),
+        "students_completed": recorder.completed,
+        "journeys_per_sec": round(recorder.completed / elapsed, 2) if elapsed else None,
+        "operations_per_sec": round(operations / elapsed, 2) if elapsed else None,
+        "lock_errors": sum(s["locked"] for s in steps.values()),
+        "other_errors": sum(s["errors"] for s in steps.values()),
+        "error_samples": recorder.samples,
+        "steps": steps,
+    }
+
+
+def print_report(result):
+    def ms(value):
+        return "-" if value is None else f"{value:.1f}"
+
+    print(f"\n{'step':<10} {'count':>6} {'locked':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for step, s in result["steps"].items():
+        print(f"{step:<10} {s['count']:>6} {s['locked']:>7} {s['errors']:>7} {ms(s['p50_ms']):>9} "
+              f"{ms(s['p95_ms']):>9} {ms(s['p99_ms']):>9} {ms(s['max_ms']):>9}")
+    p = result["parameters"]
+    print(f"\n👥 {result['students_completed']}/{p['students']} students completed in {result['elapsed_s']}s "
+          f"({result['journeys_per_sec']} journeys/s, {result['operations_per_sec']} ops/s)")
+    print(f"🔒 'database is locked' errors: {result['lock_errors']}   ❌ other errors: {result['other_errors']}")
+    for kind, message in result["error_samples"].items():
+        print(f"   {kind}: {message}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate the admission-deadline rush against the student portal")
+    parser.add_argument("--driver", choices=DRIVERS, default="backend")
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--arrival-rate", type=float, default=10.0, help="new students per second (0 = all at once)")
+    parser.add_argument("--concurrency", type=int, default=0, help="max simultaneous sessions (default: unbounded)")
+    parser.add_argument("--resubmits", type=int, default=1, help="form resubmissions per student")
+    parser.add_argument("--uploads", choices=["none", "text", "scanned"], default="none",
+                        help="PDFs uploaded with the form (needs poppler; scanned also needs tesseract)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between steps (s)")
+    parser.add_argument("--applicants", type=int, default=0, help="synthetic applicants preloaded into the DB")
+    parser.add_argument("--apptest-timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    parser.add_argument("--keep-workspace", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.uploads != "none" and not shutil.which("pdftoppm"):
+        sys.exit("--uploads needs poppler (pdftoppm) installed")
+    if args.uploads == "scanned" and not shutil.which("tesseract"):
+        sys.exit("--uploads scanned needs tesseract installed")
+
+    os.environ.setdefault("METRICS_PORT", "0")  # the apptest driver must not grab the portal's port
+    workspace, backend = fixtures.make_workspace(args.applicants, prefix="admission-load-")
+    try:
+        driver = DRIVERS[args.driver](backend, args)
+        print(f"🚦 {args.students} students via {args.driver}, {args.arrival_rate}/s arrivals ...", flush=True)
+        recorder, elapsed = run_load(driver, args)
+    finally:
+        os.chdir(REPO_ROOT)
+        if not args.keep_workspace:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    result = report(recorder, elapsed, args)
+    print_report(result)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2))
+        print(f"\n📄 Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# -------------------------
+# Admission hot-path benchmarks
+# -------------------------
+# Runs entirely offline inside a throw-away workspace (fresh admissions.db
+# and vector_db), so it never touches real data. Usage:
+#
+#   python benchmarks/run_benchmarks.py                      # run and compare; fails without a baseline
+#   python benchmarks/run_benchmarks.py --save-baseline      # run and store as the new baseline
+#   python benchmarks/run_benchmarks.py --threshold 0.15     # fail if >15% slower than baseline
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "latest.json"
+
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+
+import fixtures  # noqa: E402
+
+
+class Skip(Exception):
+    pass
+
+
+def _throughput(fn, iterations, repeat):
+    """Best-of-repeat operations per second for fn(i) called `iterations` times"""
+    best = 0.0
+    for r in range(repeat):
+        start = time.perf_counter()
+        for i in range(iterations):
+            fn(r * iterations + i)
+        elapsed = time.perf_counter() - start
+        best = max(best, iterations / elapsed if elapsed else float("inf"))
+    return best
+
+
+# -------------------------
+# Benchmarks
+# -------------------------
+def bench_ocr_pages(env, args):
+    if not (shutil.which("tesseract") and shutil.which("pdftoppm")):
+        raise Skip("tesseract / poppler not installed")
+    backend = env["backend"]
+    applicant = fixtures.synthetic_applicant(0)
+    pages = 2
+    scanned = fixtures.make_scanned_pdf(fixtures.document_lines(applicant, "class_12_marksheet"), pages=pages)
+    text_pdf = fixtures.make_text_pdf(fixtures.document_lines(applicant, "jee_rank_card"), pages=pages)
+    docs = [scanned, text_pdf]
+
+    def run(i):
+        backend.extract_text_from_scanned_pdf(fixtures.UploadedPDF(docs[i % 2]))
+
+    return _throughput(run, args.ocr_docs, args.repeat) * pages, "pages/s"
+
+
+def bench_embeddings(env, args):
+    from chromadb.utils import embedding_functions
+    model = Path.home() / ".cache" / "chroma" / "onnx_models" / "all-MiniLM-L6-v2" / "onnx" / "model.onnx"
+    if not model.exists():
+        raise Skip("ONNX MiniLM model not cached (run the portal once online)")
+    embed = embedding_functions.DefaultEmbeddingFunction()
+    texts = [" ".join(fixtures.document_lines(fixtures.synthetic_applicant(i), "class_12_marksheet"))
+             for i in range(32)]
+    embed(texts[:1])  # load the model outside the timed loop
+    return _throughput(lambda i: embed(texts), args.embed_batches, args.repeat) * len(texts), "embeddings/s"
+
+
+def bench_db_upsert_insert(env, args):
+    backend = env["backend"]
+    offset = 1_000_000
+
+    def run(i):
+        a = fixtures.synthetic_applicant(offset + i)
+        backend.upsert_student_data(**{k: v for k, v in a.items()})
+
+    return _throughput(run, args.db_ops, args.repeat), "ops/s"
+
+
+def bench_db_upsert_update(env, args):
+    backend = env["backend"]
+
+    def run(i):
+        a = fixtures.synthetic_applicant(i % args.applicants)
+        a["jee_rank"] += i + 1  # one changed field per resubmission
+        backend.upsert_student_data(**a)
+
+    return _throughput(run, args.db_ops, args.repeat), "ops/s"
+
+
+def bench_db_fetch(env, args):
+    backend = env["backend"]
+    return _throughput(lambda i: backend.fetch_student_data(fixtures.synthetic_applicant(i % args.applicants)["email"]),
+                       args.db_ops, args.repeat), "ops/s"
+
+
+def bench_db_verify_user(env, args):
+    backend = env["backend"]
+    return _throughput(lambda i: backend.verify_user(f"student{i % args.applicants:06d}@example.com", "password"),
+                       args.db_ops, args.repeat), "ops/s"
+
+
+def bench_document_updates(env, args):
+    backend = env["backend"]
+    if not shutil.which("pdftoppm"):
+        raise Skip("poppler not installed")
+    if not shutil.which("tesseract"):
+        raise Skip("tesseract not installed")
+    applicants = [fixtures.synthetic_applicant(i) for i in range(args.doc_updates)]
+    pdfs = {a["email"]: [fixtures.make_scanned_pdf(fixtures.document_lines(a, d)) for d in backend.DOC_TYPES]
+            for a in applicants}
+
+    def run(i):
+        a = applicants[i % len(applicants)]
+        # a changed first page each time, so the unchanged-file shortcut does not kick in
+        files = [fixtures.UploadedPDF(pdf + f"%{i}\n".encode()) for pdf in pdfs[a["email"]]]
+        backend.update_documents(a["email"], files)
+
+    return _throughput(run, args.doc_updates, args.repeat), "submissions/s"
+
+
+def bench_emails(env, args):
+    try:
+        import communicator
+    except ImportError as e:
+        raise Skip(f"communicator dependencies missing: {e}")
+    service = fixtures.StubGmailService(latency=args.gmail_latency)
+    communicator.authenticate_gmail = lambda: service
+    communicator.generate_email_body = lambda student: fixtures.stub_email_body(student, args.llm_latency)
+    students = [{"email": fixtures.synthetic_applicant(i)["email"], "status": "accepted", "issues": []}
+                for i in range(args.emails)]
+    best = 0.0
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        communicator.run_communicator_pipeline(students)
+        best = max(best, len(students) / (time.perf_counter() - start))
+    return best, "emails/s"
+
+
+BENCHMARKS = {
+    "ocr_pages_per_sec": bench_ocr_pages,
+    "embeddings_per_sec": bench_embeddings,
+    "db_upsert_insert_per_sec": bench_db_upsert_insert,
+    "db_upsert_update_per_sec": bench_db_upsert_update,
+    "db_fetch_per_sec": bench_db_fetch,
+    "db_verify_user_per_sec": bench_db_verify_user,
+    "document_updates_per_sec": bench_document_updates,
+    "emails_per_sec": bench_emails,
+}
+
+
+# -------------------------
+# Workspace
+# -------------------------
+def prepare_workspace(args):
+    workspace, backend = fixtures.make_workspace(args.applicants)
+    return {"workspace": workspace, "backend": backend}
+
+
+# -------------------------
+# Results
+# -------------------------
+def compare(results, baseline, threshold):
+    """Print current vs baseline and return the names that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if current["status"] != "ok" or not base or base.get("status") != "ok":
+            print(f"{name:<28} {'-':>12} {current.get('value', '-')!s:>12} {current['status']:>8}")
+            continue
+        change = current["value"] / base["value"] - 1
+        flag = "  ❌" if change < -threshold else ""
+        print(f"{name:<28} {base['value']:>12.1f} {current['value']:>12.1f} {change:>+7.1%}{flag}")
+        if change < -threshold:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the admission hot paths")
+    parser.add_argument("--only", help="comma separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, best one is kept")
+    parser.add_argument("--applicants", type=int, default=2000, help="synthetic applicants preloaded")
+    parser.add_argument("--db-ops", type=int, default=300)
+    parser.add_argument("--ocr-docs", type=int, default=4)
+    parser.add_argument("--embed-batches", type=int, default=5)
+    parser.add_argument("--doc-updates", type=int, default=3)
+    parser.add_argument("--emails", type=int, default=50)
+    parser.add_argument("--gmail-latency", type=float, default=0.0, help="simulated Gmail API latency (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated LLM latency (s)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--keep-workspace", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+    env = prepare_workspace(args)
+    results = {}
+    try:
+        for name in selected:
+            print(f"⏱️  {name} ...", flush=True)
+            try:
+                value, unit = BENCHMARKS[name](env, args)
+                results[name] = {"status": "ok", "value": round(value, 2), "unit": unit}
+            except Skip as e:
+                results[name] = {"status": "skipped", "reason": str(e)}
+                print(f"   skipped: {e}")
+    finally:
+        os.chdir(REPO_ROOT)
+        if not args.keep_workspace:
+            shutil.rmtree(env["workspace"], ignore_errors=True)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {k: v for k, v in vars(args).items() if isinstance(v, (int, float)) and not isinstance(v, bool)},
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"\n📄 Results written to {args.output}")
+
+    regressions = []
+    if args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+    elif not args.save_baseline:
+        # nothing was compared, so this run must not pass as "no regressions"
+        print(f"\n❌ No baseline at {args.baseline}; record one on this machine with --save-baseline")
+        return 1
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"💾 Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"\n❌ Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# -------------------------
+# Start-up profile of the portal and CLI entry points
+# -------------------------
+# Each target starts in a fresh interpreter under `python -X importtime`
+# inside a throw-away workspace. Streamlit apps (*.py) are rendered once
+# with streamlit.testing, which is what a first page load costs on a
+# freshly started server; other targets are imported as modules. Usage:
+#
+#   python benchmarks/startup_profile.py                          # default targets
+#   python benchmarks/startup_profile.py login_app.py communicator --top 15
+#   python benchmarks/startup_profile.py --output startup.json
+#
+# Per target it prints the time to first render (or to import), and which
+# top-level packages that time went to.
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+DEFAULT_TARGETS = ["login_app.py", "admin_app.py", "pipeline", "communicator", "main"]
+SCRIPT_MARKER = "--- startup_profile: script ---"
+
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+
+import fixtures  # noqa: E402
+
+APP_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+harness = time.perf_counter() - start
+at = AppTest.from_file({path!r}, default_timeout=300)
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+at.run()
+print(json.dumps({{"harness": harness, "first_render": time.perf_counter() - start,
+                  "exceptions": [e.message for e in at.exception]}}))
+"""
+
+MODULE_CHILD = """
+import json, sys, time
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"import": time.perf_counter() - start}}))
+"""
+
+
+def parse_importtime(stderr):
+    """(self_us, cumulative_us, module) per import after the script marker"""
+    rows = []
+    seen_marker = False
+    for line in stderr.splitlines():
+        if line == SCRIPT_MARKER:
+            seen_marker = True
+            continue
+        if not seen_marker or not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def breakdown(rows, first_party):
+    """Self time per top-level package, and cumulative time of first-party modules"""
+    packages = defaultdict(int)
+    for self_us, _, name in rows:
+        packages[name.split(".")[0]] += self_us
+    local = {name: cumulative_us for _, cumulative_us, name in rows if name in first_party}
+    return (sorted(packages.items(), key=lambda kv: -kv[1]),
+            sorted(local.items(), key=lambda kv: -kv[1]))
+
+
+def profile_target(target, first_party):
+    if target.endswith(".py"):
+        code = APP_CHILD.format(path=str(REPO_ROOT / target), marker=SCRIPT_MARKER)
+    else:
+        code = MODULE_CHILD.format(module=target, marker=SCRIPT_MARKER)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(REPO_ROOT), os.environ.get("PYTHONPATH", "")]))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, env=env)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        return {"target": target, "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    packages, local = breakdown(parse_importtime(proc.stderr), first_party)
+    return {
+        "target": target,
+        "process_seconds": round(wall, 3),
+        **{k: round(v, 3) if isinstance(v, float) else v for k, v in timings.items()},
+        "import_seconds": round(sum(us for _, us in packages) / 1e6, 3),
+        "packages": [(name, round(us / 1e6, 4)) for name, us in packages],
+        "first_party": [(name, round(us / 1e6, 4)) for name, us in local],
+    }
+
+
+def report(result, top):
+    target = result["target"]
+    if "error" in result:
+        print(f"❌ {target}: {result['error']}")
+        return
+    if "first_render" in result:
+        print(f"▶️  {target}: first render {result['first_render']:.2f}s "
+              f"(streamlit.testing {result['harness']:.2f}s, whole process {result['process_seconds']:.2f}s)")
+        for message in result["exceptions"]:
+            print(f"   ⚠️ script raised: {message}")
+    else:
+        print(f"▶️  {target}: import {result['import']:.2f}s (whole process {result['process_seconds']:.2f}s)")
+    print(f"   imports: {result['import_seconds']:.2f}s")
+    for name, seconds in result["packages"][:top]:
+        print(f"     {name:<28}{seconds * 1000:>9.1f} ms")
+    if result["first_party"]:
+        print("   repo modules (cumulative):")
+        for name, seconds in result["first_party"][:top]:
+            print(f"     {name:<28}{seconds * 1000:>9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time breakdown and time to first render")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS,
+                        help="Streamlit apps (login_app.py) or modules (communicator)")
+    parser.add_argument("--top", type=int, default=10, help="packages listed per target")
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    first_party = {p.stem for p in REPO_ROOT.glob("*.py")}
+    os.environ.setdefault("METRICS_PORT", "0")  # do not grab a running portal's port
+    workspace, _ = fixtures.make_workspace(prefix="startup-")
+    results = []
+    try:
+        for target in args.targets:
+            results.append(profile_target(target, first_party))
+            report(results[-1], args.top)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import hashlib
+import sqlite3
+from datetime import datetime
+
+from config import DB_PATH
+
+# -------------------------
+# Per-field / per-document change tracking
+# -------------------------
+# Every form field and every uploaded document has a fingerprint row in
+# Submission_Fingerprints. A resubmission only rewrites the items whose
+# fingerprint changed and leaves them with Validated = FALSE, so the
+# validator can re-check just the field/document pairs that depend on them.
+
+PRIMARY_FIELDS = ["Name", "Mobile_Number"]
+APPLICATION_FIELDS = ["Aadhar_Number", "DOB", "Class_10_Year", "Class_10_Avg_Marks", "Class_12_Year",
+                      "Class_12_Physics", "Class_12_Maths", "Class_12_Chemistry", "JEE_Year", "JEE_Rank",
+                      "Stream_Applied"]
+
+
+def init_change_tracking(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Submission_Fingerprints (
+        Email TEXT NOT NULL,
+        Item VARCHAR(50) NOT NULL,          -- column name or document_type
+        Fingerprint CHAR(64) NOT NULL,
+        Changed_At TIMESTAMP,
+        Validated BOOLEAN DEFAULT FALSE,
+        PRIMARY KEY (Email, Item)
+    )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def fingerprint(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(value).hexdigest()
+    return hashlib.sha256(str(value).encode()).hexdigest()
+
+
+def stored_fingerprints(cursor, email):
+    cursor.execute("SELECT Item, Fingerprint FROM Submission_Fingerprints WHERE Email=?", (email,))
+    return dict(cursor.fetchall())
+
+
+def record_fields(cursor, email, fields):
+    """Store fingerprints for the submitted fields and return the names that changed.
+
+    Runs on the caller's cursor so it commits together with the data update.
+    """
+    stored = stored_fingerprints(cursor, email)
+    now = datetime.now()
+    changed = []
+    for name, value in fields.items():
+        fp = fingerprint(value)
+        if stored.get(name) != fp:
+            changed.append(name)
+            cursor.execute("""
+                INSERT INTO Submission_Fingerprints (Email, Item, Fingerprint, Changed_At, Validated)
+                VALUES (?, ?, ?, ?, FALSE)
+                ON CONFLICT(Email, Item) DO UPDATE SET
+                    Fingerprint=excluded.Fingerprint, Changed_At=excluded.Changed_At, Validated=FALSE
+            """, (email, name, fp, now))
+    return changed
+
+
+def document_unchanged(email, doc_type, fp, db_path=DB_PATH):
+    conn = sqlite3.connect(db_path, timeout=30)
+    cursor = conn.cursor()
+    cursor.execute("SELECT Fingerprint FROM Submission_Fingerprints WHERE Email=? AND Item=?", (email, doc_type))
+    row = cursor.fetchone()
+    conn.close()
+    return row is not None and row[0] == fp
+
+
+def record_document(email, doc_type, fp, db_path=DB_PATH):
+    """Store a processed document's fingerprint and flag the application for re-validation.
+
+    With fp=None (OCR found no text) the stored fingerprint is dropped
+    instead, so uploading the same file again is processed again.
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    cursor = conn.cursor()
+    if fp is None:
+        cursor.execute("DELETE FROM Submission_Fingerprints WHERE Email=? AND Item=?", (email, doc_type))
+    else:
+        cursor.execute("""
+            INSERT INTO Submission_Fingerprints (Email, Item, Fingerprint, Changed_At, Validated)
+            VALUES (?, ?, ?, ?, FALSE)
+            ON CONFLICT(Email, Item) DO UPDATE SET
+                Fingerprint=excluded.Fingerprint, Changed_At=excluded.Changed_At, Validated=FALSE
+        """, (email, doc_type, fp, datetime.now()))
+    cursor.execute("UPDATE Application_Data SET application_edited=TRUE WHERE Email=?", (email,))
+    conn.commit()
+    conn.close()
+
+
+def pending_items(cursor, emails):
+    """{email: (all tracked items, {item: fingerprint} not yet validated)}"""
+    placeholders = ",".join("?" * len(emails))
+    cursor.execute(f"""
+        SELECT Email, Item, Fingerprint, Validated FROM Submission_Fingerprints
+        WHERE Email IN ({placeholders})
+    """, emails)
+    items = {}
+    for email, item, fp, validated in cursor.fetchall():
+        tracked, pending = items.setdefault(email, (set(), {}))
+        tracked.add(item)
+        if not validated:
+            pending[item] = fp
+    return items
+
+
+def mark_validated(cursor, email, pending):
+    """Mark items validated, unless they changed again while validation ran"""
+    cursor.executemany("""
+        UPDATE Submission_Fingerprints SET Validated=TRUE
+        WHERE Email=? AND Item=? AND Fingerprint=?
+    """, [(email, item, fp) for item, fp in pending.items()])
@@ -0,0 +1,268 @@
+import argparse
+import os
+import re
+import sqlite3
+import stat
+from pathlib import Path
+
+from config import COHORT, COHORT_DIR, LEGACY_DB_PATH, VECTOR_DB_PATH, BASE_COLLECTION_NAME
+import admin_backend
+import main
+import vector_maintenance
+
+# -------------------------
+# Per-cohort storage
+# -------------------------
+# One SQLite file (database/cohorts/admissions_<cohort>.db) and one Chroma
+# collection (student_documents_<cohort>) per admission cycle. The portal
+# and pipeline only open the active cohort (ADMISSION_COHORT), so its
+# queries, indexes and VACUUMs stay the size of one cycle. Past cohorts are
+# archived read-only and ATTACHed only for cross-year reports.
+#
+#   python cohorts.py split --active 2025    # one-off: partition admissions.db by JEE_Year
+#   python cohorts.py list
+#   python cohorts.py archive 2024           # ANALYZE + VACUUM, then read-only
+#   python cohorts.py report                 # cross-year summary
+
+COHORT_FILE = re.compile(r"admissions_([A-Za-z0-9_]+)\.db")
+DERIVED_TABLES = {"Admission_Stats"}  # recounted after a split instead of copied
+# accounts outlive a cycle: the active cohort keeps all of them so every
+# student can still log in; past cohorts get their own applicants' rows
+ACCOUNT_TABLES = {"Login_Credentials", "Primary_Data", "Sessions"}
+
+
+def _checked(cohort):
+    # cohort names end up in file, schema and collection names
+    if not re.fullmatch(r"[A-Za-z0-9_]+", str(cohort)):
+        raise ValueError(f"Invalid cohort name: {cohort!r}")
+    return str(cohort)
+
+
+def cohort_db_path(cohort, cohort_dir=COHORT_DIR):
+    return os.path.join(cohort_dir, f"admissions_{_checked(cohort)}.db")
+
+
+def cohort_collection_name(cohort):
+    return f"{BASE_COLLECTION_NAME}_{_checked(cohort)}"
+
+
+def list_cohorts(cohort_dir=COHORT_DIR):
+    if not os.path.isdir(cohort_dir):
+        return []
+    return sorted(m.group(1) for name in os.listdir(cohort_dir) if (m := COHORT_FILE.fullmatch(name)))
+
+
+def _columns(conn, schema, table):
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+# -------------------------
+# Split the single-file database
+# -------------------------
+def split_database(source=LEGACY_DB_PATH, active=COHORT, cohort_dir=COHORT_DIR, vector_path=VECTOR_DB_PATH):
+    """Copy a single-file admissions.db into one file (and collection) per JEE_Year.
+
+    Applications, results and documents are partitioned. Every account
+    (login, profile, sessions) is copied into the active cohort whatever
+    its JEE_Year, and tables not keyed by Email (seat matrix, counselling
+    rounds) go to the active cohort only. The source file and the old
+    collection are left untouched. Returns {cohort: emails}.
+    """
+    if active is None:
+        raise ValueError("The active cohort is needed (ADMISSION_COHORT or --active)")
+    active = _checked(active)
+    conn = sqlite3.connect(source)
+    years = [str(row[0]) for row in conn.execute(
+        "SELECT DISTINCT JEE_Year FROM Application_Data WHERE JEE_Year IS NOT NULL")]
+    conn.close()
+    os.makedirs(cohort_dir, exist_ok=True)
+
+    emails = {}
+    for cohort in sorted(set(years) | {active}):
+        path = cohort_db_path(cohort, cohort_dir)
+        main.init_sql_db(path)
+        conn = sqlite3.connect(path)
+        conn.execute("ATTACH DATABASE ? AS legacy", (source,))
+        conn.execute("CREATE TEMP TABLE cohort_emails (Email TEXT PRIMARY KEY)")
+        conn.execute("INSERT INTO cohort_emails SELECT Email FROM legacy.Application_Data WHERE JEE_Year = ?",
+                     (cohort,))
+        if cohort == active:
+            conn.execute("""
+                INSERT OR IGNORE INTO cohort_emails
+                SELECT Email FROM legacy.Login_Credentials
+                WHERE Email NOT IN (SELECT Email FROM legacy.Application_Data WHERE JEE_Year IS NOT NULL)
+            """)
+
+        tables = [row[0] for row in conn.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")]
+        for table in tables:
+            if table in DERIVED_TABLES or table.startswith("sqlite_"):
+                continue
+            legacy_columns = _columns(conn, "legacy", table)
+            if not legacy_columns:
+                continue
+            columns = ", ".join(c for c in _columns(conn, "main", table) if c in legacy_columns)
+            if cohort == active and table in ACCOUNT_TABLES:
+                where = ""
+            elif "Email" in legacy_columns:
+                where = "WHERE Email IN (SELECT Email FROM temp.cohort_emails)"
+            elif cohort == active:
+                where = ""
+            else:
+                continue
+            conn.execute(f"INSERT OR IGNORE INTO main.{table} ({columns}) SELECT {columns} FROM legacy.{table} {where}")
+        conn.commit()
+        emails[cohort] = [row[0] for row in conn.execute("SELECT Email FROM temp.cohort_emails")]
+        conn.close()
+        admin_backend.rebuild_stats(path)
+
+    split_collection(emails, vector_path)
+    return emails
+
+
+def split_collection(emails, vector_path=VECTOR_DB_PATH):
+    """Copy each cohort's documents (embeddings included) into its own collection"""
+    import chromadb
+
+    if not os.path.isdir(vector_path):
+        return {}
+    client = chromadb.PersistentClient(path=vector_path)
+    try:
+        source = client.get_collection(BASE_COLLECTION_NAME)
+    except ValueError:
+        return {}
+    copied = {}
+    for cohort, cohort_emails in emails.items():
+        dest = client.get_or_create_collection(cohort_collection_name(cohort), metadata=source.metadata)
+        copied[cohort] = vector_maintenance.copy_documents(
+            source, dest, vector_maintenance.document_ids(cohort_emails))
+    return copied
+
+
+# -------------------------
+# Archive
+# -------------------------
+def archive_cohort(cohort, cohort_dir=COHORT_DIR):
+    """Final ANALYZE + VACUUM of a finished cohort, then make its file read-only"""
+    if str(cohort) == str(COHORT):
+        raise ValueError(f"{cohort} is the active cohort")
+    path = cohort_db_path(cohort, cohort_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    os.chmod(path, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+    conn = sqlite3.connect(path)
+    # rollback journal: a read-only file must not need a -wal/-shm to be opened
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    return os.path.getsize(path)
+
+
+def is_archived(cohort, cohort_dir=COHORT_DIR):
+    return not os.stat(cohort_db_path(cohort, cohort_dir)).st_mode & stat.S_IWUSR
+
+
+# -------------------------
+# Cross-year reports
+# -------------------------
+def _read_only_uri(path):
+    return Path(path).resolve().as_uri() + "?mode=ro"
+
+
+def connect_reports(active=COHORT, cohort_dir=COHORT_DIR):
+    """Read-only connection to the active cohort with every other cohort ATTACHed read-only.
+
+    Returns (conn, {cohort: schema}). SQLite allows 10 attached databases
+    by default, so this covers the active year plus ten archived ones.
+    """
+    cohorts = list_cohorts(cohort_dir)
+    if not cohorts:
+        raise FileNotFoundError(f"No cohort databases in {cohort_dir}")
+    first = str(active) if str(active) in cohorts else cohorts[-1]
+    conn = sqlite3.connect(_read_only_uri(cohort_db_path(first, cohort_dir)), uri=True)
+    schemas = {first: "main"}
+    for cohort in cohorts:
+        if cohort != first:
+            schemas[cohort] = f"cohort_{cohort}"
+            conn.execute(f"ATTACH DATABASE ? AS {schemas[cohort]}", (_read_only_uri(cohort_db_path(cohort, cohort_dir)),))
+    return conn, dict(sorted(schemas.items()))
+
+
+def _union(schemas, select):
+    return " UNION ALL ".join(select.format(cohort=cohort, schema=schema) for cohort, schema in schemas.items())
+
+
+def cross_year_report(active=COHORT, cohort_dir=COHORT_DIR):
+    """Per-cohort totals and per-stream intake, plus applicants who applied in an earlier cohort too"""
+    conn, schemas = connect_reports(active, cohort_dir)
+    stats = _union(schemas, "SELECT '{cohort}' AS Cohort, * FROM {schema}.Admission_Stats")
+    totals = conn.execute(f"""
+        SELECT Cohort, SUM(Applicants),
+               SUM(CASE WHEN Validation_Status = 'valid' THEN Applicants ELSE 0 END),
+               SUM(CASE WHEN Result_Status = 'accepted' THEN Applicants ELSE 0 END)
+        FROM ({stats}) GROUP BY Cohort ORDER BY Cohort
+    """).fetchall()
+    streams = conn.execute(f"""
+        SELECT Cohort, Stream, SUM(Applicants),
+               SUM(CASE WHEN Result_Status = 'accepted' THEN Applicants ELSE 0 END)
+        FROM ({stats}) WHERE Applicants > 0 GROUP BY Cohort, Stream ORDER BY Stream, Cohort
+    """).fetchall()
+    # same Aadhar number in an earlier cohort, whatever email was used
+    applications = _union(schemas, "SELECT '{cohort}' AS Cohort, Aadhar_Number FROM {schema}.Application_Data")
+    repeat = dict(conn.execute(f"""
+        WITH apps AS ({applications}),
+             firsts AS (SELECT Aadhar_Number, MIN(Cohort) AS First_Cohort FROM apps GROUP BY Aadhar_Number)
+        SELECT a.Cohort, COUNT(*) FROM apps a JOIN firsts f ON f.Aadhar_Number = a.Aadhar_Number
+        WHERE a.Cohort > f.First_Cohort GROUP BY a.Cohort
+    """).fetchall())
+    conn.close()
+    return {
+        "cohorts": [
+            {"Cohort": cohort, "Applications": applications, "Valid": valid, "Accepted": accepted,
+             "Reapplied": repeat.get(cohort, 0)}
+            for cohort, applications, valid, accepted in totals
+        ],
+        "streams": [
+            {"Cohort": cohort, "Stream": stream or "(none)", "Applications": applications, "Accepted": accepted}
+            for cohort, stream, applications, accepted in streams
+        ],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-cohort admissions databases")
+    sub = parser.add_subparsers(dest="command", required=True)
+    split = sub.add_parser("split", help="partition a single-file admissions.db by JEE_Year")
+    split.add_argument("--source", default=LEGACY_DB_PATH)
+    split.add_argument("--active", default=COHORT, help="cohort the portal runs on; it keeps every account")
+    sub.add_parser("list")
+    archive = sub.add_parser("archive", help="VACUUM a finished cohort and make it read-only")
+    archive.add_argument("cohort")
+    sub.add_parser("report", help="cross-year summary over all cohorts")
+    args = parser.parse_args()
+
+    if args.command == "split":
+        emails = split_database(args.source, args.active)
+        for cohort, members in emails.items():
+            print(f"📦 {cohort}: {len(members)} accounts -> {cohort_db_path(cohort)}")
+        print(f"✅ Set ADMISSION_COHORT={args.active} to run the portal on the active cohort; "
+              f"{args.source} was left as it was")
+    elif args.command == "list":
+        for cohort in list_cohorts():
+            path = cohort_db_path(cohort)
+            state = "active" if cohort == str(COHORT) else "archived" if is_archived(cohort) else ""
+            print(f"{cohort:<10}{os.path.getsize(path) / 1e6:>10.1f} MB  {state}")
+    elif args.command == "archive":
+        size = archive_cohort(args.cohort)
+        print(f"🗄️ Archived cohort {args.cohort} ({size / 1e6:.1f} MB, read-only)")
+    elif args.command == "report":
+        report = cross_year_report()
+        print(f"{'Cohort':<10}{'Applications':>14}{'Valid':>8}{'Accepted':>10}{'Reapplied':>11}")
+        for row in report["cohorts"]:
+            print(f"{row['Cohort']:<10}{row['Applications']:>14}{row['Valid']:>8}{row['Accepted']:>10}{row['Reapplied']:>11}")
+        print()
+        print(f"{'Stream':<14}{'Cohort':<10}{'Applications':>14}{'Accepted':>10}")
+        for row in report["streams"]:
+            print(f"{row['Stream']:<14}{row['Cohort']:<10}{row['Applications']:>14}{row['Accepted']:>10}")
@@ -2,19 +2,22 @@ import json
 import datetime
 import os
 import base64
+import threading
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from email.mime.text import MIMEText
+import metrics
+
+# crewai and the Google client libraries take seconds to import, so they are
+# imported inside the functions that use them; dry runs and imports of this
+# module for its helpers never load them.
 
 # -------------------------
 # Load Environment Variables
 # -------------------------
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY  # For LiteLLM if used by CrewAI
+if OPENAI_API_KEY:
+    os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY  # For LiteLLM if used by CrewAI
 
 # -------------------------
 # Gmail Authentication
@@ -22,6 +25,10 @@ os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY  # For LiteLLM if used by CrewAI
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
 def authenticate_gmail():
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+
     creds = None
     if os.path.exists("token.json"):
         creds = Credentials.from_authorized_user_file("token.json", SCOPES)
@@ -41,26 +48,33 @@ def send_email(service, to, subject, body):
     message['subject'] = subject
     raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
     message = {'raw': raw}
-    sent_message = service.users().messages().send(userId="me", body=message).execute()
+    with metrics.timed("admission_gmail_send_seconds", "Gmail API send latency"):
+        sent_message = service.users().messages().send(userId="me", body=message).execute()
+    metrics.counter("admission_emails_sent_total", "Emails sent through Gmail").inc()
     print(f"> ✅ Sent email to {to} (ID: {sent_message['id']})")
 
 # -------------------------
 # Logging Function
 # -------------------------
+_log_lock = threading.Lock()
+
 def log_to_file(data, log_file="email_log.json"):
-    if os.path.exists(log_file):
-        with open(log_file, "r") as f:
-            logs = json.load(f)
-    else:
-        logs = []
-    logs.append(data)
-    with open(log_file, "w") as f:
-        json.dump(logs, f, indent=4)
+    with _log_lock:
+        if os.path.exists(log_file):
+            with open(log_file, "r") as f:
+                logs = json.load(f)
+        else:
+            logs = []
+        logs.append(data)
+        with open(log_file, "w") as f:
+            json.dump(logs, f, indent=4)
 
 # -------------------------
 # Generate Email using CrewAI
 # -------------------------
 def generate_email_body(student):
+    from crewai import Agent, Task, Crew
+
     communicator = Agent(
         role="Admission Communicator",
         goal="Write short and polite emails to students regarding their admission status",
@@ -91,32 +105,37 @@ def generate_email_body(student):
     )
 
     crew = Crew(agents=[communicator], tasks=[task], verbose=True)
-    result = crew.kickoff()
+    with metrics.timed("admission_llm_call_seconds", "CrewAI email generation latency"):
+        result = crew.kickoff()
 
     return str(result).strip()  # 🧯 FIXED LINE
 
 # -------------------------
 # Main Workflow
 # -------------------------
-def run_communicator_pipeline():
-    with open("students.json", "r") as f:
-        validator_output = json.load(f)
+def notify_student(service, student):
+    print(f"\n📨 Processing email for: {student['email']}")
 
-    service = authenticate_gmail()
+    email_body = generate_email_body(student)
+    send_email(service, student["email"], "Your Application Status", email_body)
 
-    for student in validator_output:
-        print(f"\n📨 Processing email for: {student['email']}")
+    log_data = {
+        "email": student["email"],
+        "status": student["status"],
+        "issues": student["issues"],
+        "timestamp": datetime.datetime.now().isoformat()
+    }
+    log_to_file(log_data)
 
-        email_body = generate_email_body(student)
-        send_email(service, student["email"], "Your Application Status", email_body)
+def run_communicator_pipeline(students=None):
+    if students is None:
+        with open("students.json", "r") as f:
+            students = json.load(f)
+
+    service = authenticate_gmail()
 
-        log_data = {
-            "email": student["email"],
-            "status": student["status"],
-            "issues": student["issues"],
-            "timestamp": datetime.datetime.now().isoformat()
-        }
-        log_to_file(log_data)
+    for student in students:
+        notify_student(service, student)
 
 # -------------------------
 # Entry Point
@@ -0,0 +1,40 @@
+import os
+from dotenv import load_dotenv
+
+# -------------------------
+# Shared paths and settings
+# -------------------------
+load_dotenv()
+
+# Partitioned storage (cohorts.py): with ADMISSION_COHORT set, e.g. 2025, the
+# portal and pipeline work on that cycle's own SQLite file and Chroma
+# collection; past cohorts stay in their files and are only read for reports
+COHORT = os.getenv("ADMISSION_COHORT")
+COHORT_DIR = os.getenv("COHORT_DIR", "database/cohorts")
+LEGACY_DB_PATH = "database/admissions.db"
+BASE_COLLECTION_NAME = "student_documents"
+
+DB_PATH = os.getenv("ADMISSIONS_DB_PATH",
+                    os.path.join(COHORT_DIR, f"admissions_{COHORT}.db") if COHORT else LEGACY_DB_PATH)
+VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "vector_db")
+COLLECTION_NAME = f"{BASE_COLLECTION_NAME}_{COHORT}" if COHORT else BASE_COLLECTION_NAME
+
+DOC_TYPES = ["aadhar_card", "class_10_marksheet", "class_12_marksheet", "jee_rank_card"]
+
+# Prometheus text endpoint served by the portal (http://127.0.0.1:<port>/metrics)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Content-addressed snapshot store used by snapshot.py
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+
+# Document processing governor (governor.py): concurrent OCR/embedding jobs
+# across all portal sessions, how many may queue, and the memory each needs
+OCR_SLOTS = int(os.getenv("OCR_SLOTS", str(os.cpu_count() or 2)))
+MAX_QUEUED_SUBMISSIONS = int(os.getenv("MAX_QUEUED_SUBMISSIONS", "200"))
+JOB_MEMORY_MB = int(os.getenv("JOB_MEMORY_MB", "400"))
+MIN_FREE_MEMORY_MB = int(os.getenv("MIN_FREE_MEMORY_MB", "512"))
+
+# Signed login sessions (sessions.py): token lifetime, and the signing key
+# (a random key is generated and kept in the database when unset)
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+SESSION_HOURS = float(os.getenv("SESSION_HOURS", "12"))
@@ -0,0 +1,222 @@
+import re
+import sqlite3
+from datetime import datetime
+
+from config import DB_PATH, VECTOR_DB_PATH, COLLECTION_NAME, DOC_TYPES
+import change_tracking
+import metrics
+
+# -------------------------
+# Field <-> document checks
+# -------------------------
+# Each check compares one form field with the OCR text of one document.
+# (field, document_type, label)
+CHECKS = [
+    ("Name", "aadhar_card", "Name does not match Aadhar card"),
+    ("Aadhar_Number", "aadhar_card", "Aadhar number not found on Aadhar card"),
+    ("DOB", "aadhar_card", "Date of birth does not match Aadhar card"),
+    ("Name", "class_10_marksheet", "Name does not match Class 10 marksheet"),
+    ("Class_10_Year", "class_10_marksheet", "Class 10 year does not match marksheet"),
+    ("Name", "class_12_marksheet", "Name does not match Class 12 marksheet"),
+    ("Class_12_Year", "class_12_marksheet", "Class 12 year does not match marksheet"),
+    ("Class_12_Physics", "class_12_marksheet", "Physics marks do not match Class 12 marksheet"),
+    ("Class_12_Maths", "class_12_marksheet", "Maths marks do not match Class 12 marksheet"),
+    ("Class_12_Chemistry", "class_12_marksheet", "Chemistry marks do not match Class 12 marksheet"),
+    ("Name", "jee_rank_card", "Name does not match JEE rank card"),
+    ("JEE_Year", "jee_rank_card", "JEE year does not match rank card"),
+    ("JEE_Rank", "jee_rank_card", "JEE rank does not match rank card"),
+]
+
+DOC_LABELS = {
+    "aadhar_card": "Aadhar card",
+    "class_10_marksheet": "Class 10 marksheet",
+    "class_12_marksheet": "Class 12 marksheet",
+    "jee_rank_card": "JEE rank card",
+}
+
+FIELDS_SQL = """
+    SELECT p.Email, p.Name, a.Aadhar_Number, a.DOB, a.Class_10_Year, a.Class_12_Year,
+           a.Class_12_Physics, a.Class_12_Maths, a.Class_12_Chemistry, a.JEE_Year, a.JEE_Rank
+    FROM Application_Data a JOIN Primary_Data p ON p.Email = a.Email
+"""
+FIELD_NAMES = ["Name", "Aadhar_Number", "DOB", "Class_10_Year", "Class_12_Year",
+               "Class_12_Physics", "Class_12_Maths", "Class_12_Chemistry", "JEE_Year", "JEE_Rank"]
+CHECKED_ITEMS = set(FIELD_NAMES) | set(DOC_TYPES)
+
+
+def init_validation_tables(db_path=DB_PATH):
+    """Per field/document check results, so re-validation can reuse unchanged pairs"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Validation_Checks (
+        Email TEXT NOT NULL,
+        Field_Name VARCHAR(50) NOT NULL,
+        Document_Type VARCHAR(50) NOT NULL,
+        Passed BOOLEAN NOT NULL,
+        Checked_At TIMESTAMP,
+        PRIMARY KEY (Email, Field_Name, Document_Type)
+    )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def get_collection():
+    # imported here so loading the checks does not pull in chromadb
+    import chromadb
+    from chromadb.utils import embedding_functions
+
+    import vector_maintenance
+
+    chroma_client = chromadb.PersistentClient(path=VECTOR_DB_PATH)
+    vector_maintenance.recover_interrupted_compact(chroma_client, COLLECTION_NAME)
+    return chroma_client.get_or_create_collection(
+        name=COLLECTION_NAME,
+        embedding_function=embedding_functions.DefaultEmbeddingFunction()
+    )
+
+
+def _tokens(text):
+    return set(re.findall(r"[a-z0-9.]+", text.lower()))
+
+
+def _number_present(value, text):
+    if value is None:
+        return False
+    number = float(value)
+    candidates = {f"{number:g}", f"{number:.1f}", f"{number:.2f}"}
+    if number == int(number):
+        candidates.add(str(int(number)))
+    return bool(candidates & _tokens(text))
+
+
+def _date_present(value, text):
+    try:
+        dob = datetime.strptime(str(value)[:10], "%Y-%m-%d")
+    except ValueError:
+        return False
+    digits = re.sub(r"[^0-9]", "", text)
+    return any(dob.strftime(fmt) in digits for fmt in ("%d%m%Y", "%Y%m%d"))
+
+
+def check_field(field, value, text):
+    """True when the form value can be found in the document text"""
+    if not text:
+        return False
+    if field == "Name":
+        words = re.findall(r"[a-z]+", str(value or "").lower())
+        return bool(words) and all(w in _tokens(text) for w in words)
+    if field == "Aadhar_Number":
+        number = re.sub(r"[^0-9]", "", str(value or ""))
+        return bool(number) and number in re.sub(r"[^0-9]", "", text)
+    if field == "DOB":
+        return _date_present(value, text)
+    return _number_present(value, text)
+
+
+def run_checks(checks, fields, documents):
+    """[(field, document_type, passed)] for the checks whose document is present"""
+    return [
+        (field, doc_type, check_field(field, fields.get(field), documents[doc_type]))
+        for field, doc_type, _ in checks if documents.get(doc_type)
+    ]
+
+
+def validate_application(fields, documents):
+    """Run every check for one applicant.
+
+    fields: {field_name: value}, documents: {document_type: ocr_text or None}
+    Returns (is_valid, issues).
+    """
+    issues = [f"{DOC_LABELS[d]} not uploaded" for d in DOC_TYPES if not documents.get(d)]
+    failed = {(f, d) for f, d, passed in run_checks(CHECKS, fields, documents) if not passed}
+    issues += [label for f, d, label in CHECKS if (f, d) in failed]
+    return not issues, issues
+
+
+def fetch_documents(collection, wanted):
+    """{email: {document_type: text}} for the requested {email: document_types}"""
+    ids = [f"{email}_{doc_type}" for email, doc_types in wanted.items() for doc_type in doc_types]
+    documents = {email: {} for email in wanted}
+    if not ids:
+        return documents
+    with metrics.timed("admission_chroma_get_seconds", "Chroma document fetch latency"):
+        result = collection.get(ids=ids, include=["documents", "metadatas"])
+    for text, meta in zip(result["documents"], result["metadatas"]):
+        if meta and meta.get("email") in documents:
+            documents[meta["email"]][meta["document_type"]] = text
+    return documents
+
+
+def plan_checks(tracked, pending):
+    """Checks affected by changed items; items never fingerprinted count as changed"""
+    dirty = set(pending) | (CHECKED_ITEMS - tracked)
+    checks = [c for c in CHECKS if c[0] in dirty or c[1] in dirty]
+    docs = {doc_type for _, doc_type, _ in checks} | (set(DOC_TYPES) - tracked)
+    return checks, docs
+
+
+def validate_batch(emails, collection=None, db_path=DB_PATH):
+    """Re-check the changed field/document pairs of a batch and checkpoint on Application_Data"""
+    if not emails:
+        return []
+    collection = collection or get_collection()
+    init_validation_tables(db_path)
+    change_tracking.init_change_tracking(db_path)
+    conn = sqlite3.connect(db_path, timeout=30)
+    cursor = conn.cursor()
+    placeholders = ",".join("?" * len(emails))
+    cursor.execute(FIELDS_SQL + f" WHERE a.Email IN ({placeholders})", emails)
+    rows = {row[0]: dict(zip(FIELD_NAMES, row[1:])) for row in cursor.fetchall()}
+
+    items = change_tracking.pending_items(cursor, list(rows)) if rows else {}
+    plans = {}
+    for email in rows:
+        tracked, pending = items.get(email, (set(), {}))
+        plans[email] = (pending,) + plan_checks(tracked, pending)
+    documents = fetch_documents(collection, {email: plan[2] for email, plan in plans.items()})
+
+    results = []
+    now = datetime.now()
+    for email, fields in rows.items():
+        pending, checks, docs = plans[email]
+        metrics.counter("admission_checks_run_total", "Field/document checks executed").inc(len(checks))
+        texts = documents[email]
+        missing = [d for d in DOC_TYPES if d in docs and not texts.get(d)]
+
+        cursor.executemany("DELETE FROM Validation_Checks WHERE Email=? AND Field_Name=? AND Document_Type=?",
+                           [(email, field, doc_type) for field, doc_type, _ in checks])
+        cursor.executemany("""
+            INSERT INTO Validation_Checks (Email, Field_Name, Document_Type, Passed, Checked_At)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(email, f, d, passed, now) for f, d, passed in run_checks(checks, fields, texts)])
+
+        cursor.execute("SELECT Field_Name, Document_Type FROM Validation_Checks WHERE Email=? AND Passed=FALSE",
+                       (email,))
+        failed = set(cursor.fetchall())
+        issues = [f"{DOC_LABELS[d]} not uploaded" for d in missing]
+        issues += [label for f, d, label in CHECKS if (f, d) in failed]
+        valid = not issues
+
+        cursor.execute("""
+            UPDATE Application_Data SET
+                application_validation_done=TRUE, application_valid=?, error_observed=?,
+                validation_attempts=validation_attempts + 1, last_validation=?
+            WHERE Email=?
+        """, (valid, "; ".join(issues)[:600] or None, now, email))
+        change_tracking.mark_validated(cursor, email, pending)
+        conn.commit()
+        results.append((email, valid, issues))
+    conn.close()
+    return results
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(DB_PATH)
+    pending = [r[0] for r in conn.execute(
+        "SELECT Email FROM Application_Data WHERE application_validation_done = FALSE"
+    )]
+    conn.close()
+    for email, valid, issues in validate_batch(pending):
+        print(f"{'✅' if valid else '❌'} {email}: {'; '.join(issues) or 'all checks passed'}")
@@ -0,0 +1,476 @@
+import sqlite3
+import hashlib
+import re
+import threading
+from array import array
+from datetime import datetime
+
+from config import DB_PATH
+
+# -------------------------
+# Tuning
+# -------------------------
+HASH_SIZE = 8                    # dHash grid -> 64-bit page hash
+IMAGE_DISTANCE_THRESHOLD = 6     # max Hamming distance for "same page" (<= 7)
+SHINGLE_SIZE = 3                 # words per text shingle
+NUM_BINS = 60                    # one-permutation MinHash signature length
+LSH_BANDS = 20                   # 20 bands x 3 rows: 93% recall at Jaccard 0.5, >99% from 0.6, ~0 at 0.05
+MAX_CANDIDATES = 50              # text candidates verified per lookup, most shared bands first
+BOILERPLATE_SHARE = 0.05         # shingles in >= 5% of a doc_type's documents are template text ...
+BOILERPLATE_MIN_DOCS = 20        # ... once at least this many documents share them
+DF_BUCKETS = 1 << 18             # hashed document-frequency counters per doc_type
+TEXT_SIMILARITY_THRESHOLD = 0.5  # Jaccard of distinctive shingles at which text alone is a duplicate
+TEXT_SIMILARITY_WITH_IMAGE = 0.3 # ... needed when a page image also matches
+IMAGE_ONLY_DISTANCE = 2          # page this close is a duplicate even without text evidence
+MIN_PAGE_BITS = 8                # near-blank pages (few/most bits set) never match on image alone
+
+_ROWS = NUM_BINS // LSH_BANDS
+_EMPTY_BIN_STEP = 1 << 59        # densification offset per bin borrowed across (> any bin value)
+
+
+# -------------------------
+# Schema
+# -------------------------
+def init_duplicate_tables(db_path=DB_PATH):
+    """Create the signature and flag tables used by the duplicate index"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Document_Signatures (
+        Email TEXT NOT NULL,
+        Document_Type VARCHAR(50) NOT NULL,
+        Page_Hashes BLOB NOT NULL,
+        MinHash BLOB NOT NULL,
+        Updated_At TIMESTAMP,
+        PRIMARY KEY (Email, Document_Type)
+    )
+    """)
+    # MinHash is no longer written (signatures are derived from Shingles in memory)
+    cursor.execute("PRAGMA table_info(Document_Signatures)")
+    if "Shingles" not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE Document_Signatures ADD COLUMN Shingles BLOB")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Duplicate_Document_Flags (
+        Email TEXT NOT NULL,
+        Document_Type VARCHAR(50) NOT NULL,
+        Matched_Email TEXT NOT NULL,
+        Text_Similarity FLOAT,
+        Image_Distance INTEGER,
+        Flagged_At TIMESTAMP,
+        PRIMARY KEY (Email, Document_Type, Matched_Email)
+    )
+    """)
+    # newest-first review list in the admin dashboard
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_duplicate_flags_time ON Duplicate_Document_Flags (Flagged_At, Email)")
+    # inserts and replacements reach other processes' indexes by rowid;
+    # deletions bump this counter, which makes them reload from scratch
+    cursor.execute("CREATE TABLE IF NOT EXISTS Duplicate_Index_State (Id INTEGER PRIMARY KEY CHECK (Id = 1), Deletions INTEGER NOT NULL)")
+    cursor.execute("INSERT OR IGNORE INTO Duplicate_Index_State (Id, Deletions) VALUES (1, 0)")
+    # REPLACE does not fire delete triggers (recursive_triggers is off), so
+    # only real removals count; their flags go with them
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS document_signature_deleted AFTER DELETE ON Document_Signatures
+    BEGIN
+        UPDATE Duplicate_Index_State SET Deletions = Deletions + 1 WHERE Id = 1;
+        DELETE FROM Duplicate_Document_Flags
+        WHERE Document_Type = OLD.Document_Type AND (Email = OLD.Email OR Matched_Email = OLD.Email);
+    END
+    """)
+    conn.commit()
+    conn.close()
+
+
+# -------------------------
+# Signatures
+# -------------------------
+def page_hash(image):
+    """64-bit difference hash of a rasterized page"""
+    gray = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE))
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def _shingles(text):
+    tokens = re.findall(r"[a-z0-9]+", text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def shingle_hashes(text):
+    """Sorted 64-bit hashes of the OCR text's word shingles"""
+    return sorted(int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+                  for s in _shingles(text))
+
+
+def minhash(hashes):
+    """One-permutation MinHash of shingle hashes (None without any).
+
+    The shingle hash is already uniformly random, so it picks its bin and
+    serves as the permuted value: one pass instead of one per permutation.
+    Empty bins borrow the next filled bin's value (rotation densification)
+    so that short texts still band consistently.
+    """
+    if not hashes:
+        return None
+    bins = [None] * NUM_BINS
+    for h in hashes:
+        i, value = h % NUM_BINS, h // NUM_BINS
+        if bins[i] is None or value < bins[i]:
+            bins[i] = value
+    signature = []
+    for i in range(NUM_BINS):
+        steps = 0
+        while bins[(i + steps) % NUM_BINS] is None:
+            steps += 1
+        signature.append(bins[(i + steps) % NUM_BINS] + steps * _EMPTY_BIN_STEP)
+    return signature
+
+
+def band_keys(signature):
+    if signature is None:
+        return ()  # no distinctive text; such documents must not all collide
+    return tuple(hash(tuple(signature[band * _ROWS:(band + 1) * _ROWS])) for band in range(LSH_BANDS))
+
+
+def text_similarity(a, b):
+    """Jaccard similarity of two shingle sets; None when either has no (distinctive) text"""
+    if not a or not b:
+        return None
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def informative(value):
+    """False for the hashes of blank or near-uniform pages, which all look alike"""
+    return MIN_PAGE_BITS <= value.bit_count() <= 64 - MIN_PAGE_BITS
+
+
+# -------------------------
+# Multi-index hashing over page hashes
+# -------------------------
+CHUNK_BITS = 16
+NUM_CHUNKS = 64 // CHUNK_BITS
+
+
+class PageHashIndex:
+    """Bit-sampling LSH over 64-bit page hashes.
+
+    Each hash is split into four 16-bit chunks. Two hashes within Hamming
+    distance 7 must agree on some chunk up to one bit (pigeonhole), so a
+    query probes 4 x 17 buckets instead of scanning every stored page.
+    """
+
+    def __init__(self):
+        self._tables = [{} for _ in range(NUM_CHUNKS)]  # chunk value -> {hash: set(owner)}
+
+    @staticmethod
+    def _chunks(value):
+        mask = (1 << CHUNK_BITS) - 1
+        return [(value >> (i * CHUNK_BITS)) & mask for i in range(NUM_CHUNKS)]
+
+    def add(self, value, owner):
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            table.setdefault(chunk, {}).setdefault(value, set()).add(owner)
+
+    def remove(self, value, owner):
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            owners = table.get(chunk, {}).get(value)
+            if owners is not None:
+                owners.discard(owner)
+                if not owners:
+                    del table[chunk][value]
+                    if not table[chunk]:
+                        del table[chunk]
+
+    def search(self, value, radius):
+        """Return {owner: distance} for every stored hash within radius (radius <= 7)"""
+        hits = {}
+        seen = set()
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            for probe in [chunk] + [chunk ^ (1 << b) for b in range(CHUNK_BITS)]:
+                for stored, owners in table.get(probe, {}).items():
+                    if stored in seen:
+                        continue
+                    seen.add(stored)
+                    d = hamming(value, stored)
+                    if d <= radius:
+                        for owner in owners:
+                            if d < hits.get(owner, radius + 1):
+                                hits[owner] = d
+        return hits
+
+
+# -------------------------
+# Index
+# -------------------------
+class DuplicateIndex:
+    """In-memory near-duplicate index, one page-hash and MinHash LSH table per document_type.
+
+    Text is compared on its distinctive shingles only: a shingle found in
+    BOILERPLATE_SHARE of a doc_type's documents is the form's template
+    (headings, board name, column labels) and says nothing about copying.
+    Document frequencies are kept in hashed counters; a doc_type's LSH bands
+    are recomputed whenever its document count doubles, as the template
+    shows up, while the Jaccard check of a candidate always uses the current
+    counts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs = {}      # (doc_type, email) -> (page_hashes, shingle hashes, band keys)
+        self._pages = {}     # doc_type -> PageHashIndex
+        self._buckets = {}   # (doc_type, band, band_key) -> set(email)
+        self._df = {}        # doc_type -> array of document counts per hashed shingle
+        self._counts = {}    # doc_type -> number of documents
+        self._banded_at = {} # doc_type -> document count when its bands were last computed
+        self.last_rowid = 0  # newest Document_Signatures row loaded
+        self.deletions = 0   # Duplicate_Index_State.Deletions when loaded
+
+    # -- document frequencies --
+    def _distinctive(self, doc_type, hashes):
+        df = self._df.get(doc_type)
+        if df is None:
+            return set(hashes)
+        cutoff = max(BOILERPLATE_MIN_DOCS, BOILERPLATE_SHARE * self._counts[doc_type])
+        return {h for h in hashes if df[h % DF_BUCKETS] < cutoff}
+
+    def _count(self, doc_type, hashes, step):
+        df = self._df.get(doc_type)
+        if df is None:
+            df = self._df[doc_type] = array("I", bytes(4 * DF_BUCKETS))
+        for bucket in {h % DF_BUCKETS for h in hashes}:
+            df[bucket] += step
+        self._counts[doc_type] = self._counts.get(doc_type, 0) + step
+
+    # -- LSH buckets --
+    def _bucket(self, email, doc_type, keys):
+        for band, key in enumerate(keys):
+            self._buckets.setdefault((doc_type, band, key), set()).add(email)
+
+    def _unbucket(self, email, doc_type, keys):
+        for band, key in enumerate(keys):
+            bucket = self._buckets.get((doc_type, band, key))
+            if bucket is not None:
+                bucket.discard(email)
+                if not bucket:
+                    del self._buckets[(doc_type, band, key)]
+
+    def _rebanded(self, doc_type):
+        """Recompute the doc_type's bands from the current template estimate"""
+        self._banded_at[doc_type] = self._counts.get(doc_type, 0)
+        for (kind, email), (page_hashes, hashes, keys) in list(self._docs.items()):
+            if kind != doc_type:
+                continue
+            self._unbucket(email, doc_type, keys)
+            keys = band_keys(minhash(self._distinctive(doc_type, hashes)))
+            self._docs[(doc_type, email)] = (page_hashes, hashes, keys)
+            self._bucket(email, doc_type, keys)
+
+    def _maybe_reband(self, doc_type):
+        n = self._counts.get(doc_type, 0)
+        if n >= BOILERPLATE_MIN_DOCS and n >= 2 * self._banded_at.get(doc_type, 0):
+            self._rebanded(doc_type)
+
+    # -- documents --
+    def _discard(self, email, doc_type):
+        old = self._docs.pop((doc_type, email), None)
+        if old is None:
+            return
+        for h in old[0]:
+            self._pages[doc_type].remove(h, email)
+        self._unbucket(email, doc_type, old[2])
+        self._count(doc_type, old[1], -1)
+
+    def _insert(self, email, doc_type, page_hashes, hashes, band=True):
+        self._discard(email, doc_type)
+        hashes = array("Q", hashes)
+        self._count(doc_type, hashes, 1)
+        pages = self._pages.setdefault(doc_type, PageHashIndex())
+        for h in page_hashes:
+            pages.add(h, email)
+        keys = band_keys(minhash(self._distinctive(doc_type, hashes))) if band else ()
+        self._docs[(doc_type, email)] = (page_hashes, hashes, keys)
+        self._bucket(email, doc_type, keys)
+
+    def remove(self, email, doc_type):
+        with self._lock:
+            self._discard(email, doc_type)
+
+    def add(self, email, doc_type, page_hashes, hashes):
+        with self._lock:
+            self._insert(email, doc_type, page_hashes, hashes)
+            self._maybe_reband(doc_type)
+
+    def add_many(self, rows):
+        """Bulk load [(email, doc_type, page_hashes, shingle hashes)]; bands are computed once at the end"""
+        with self._lock:
+            doc_types = set()
+            for email, doc_type, page_hashes, hashes in rows:
+                self._insert(email, doc_type, page_hashes, hashes, band=False)
+                doc_types.add(doc_type)
+            for doc_type in doc_types:
+                self._rebanded(doc_type)
+
+    def find_matches(self, email, doc_type, page_hashes, hashes):
+        """Return [(matched_email, text_similarity, image_distance)] for other applicants"""
+        with self._lock:
+            image_hits = {}
+            same_image = set()  # near-identical, non-blank page: a duplicate whatever the text says
+            pages = self._pages.get(doc_type)
+            if pages is not None:
+                for h in page_hashes:
+                    for owner, d in pages.search(h, IMAGE_DISTANCE_THRESHOLD).items():
+                        if owner == email:
+                            continue
+                        if d < image_hits.get(owner, IMAGE_DISTANCE_THRESHOLD + 1):
+                            image_hits[owner] = d
+                        if d <= IMAGE_ONLY_DISTANCE and informative(h):
+                            same_image.add(owner)
+
+            # text candidates: most shared bands first, at most MAX_CANDIDATES verified
+            distinctive = self._distinctive(doc_type, hashes)
+            shared_bands = {}
+            for band, key in enumerate(band_keys(minhash(distinctive))):
+                for other in self._buckets.get((doc_type, band, key), ()):
+                    if other != email:
+                        shared_bands[other] = shared_bands.get(other, 0) + 1
+            candidates = set(image_hits) | set(
+                sorted(shared_bands, key=lambda other: -shared_bands[other])[:MAX_CANDIDATES])
+
+            matches = []
+            for other in candidates:
+                # None (no distinctive text on either side) is unknown, not "different"
+                similarity = text_similarity(distinctive,
+                                             self._distinctive(doc_type, self._docs[(doc_type, other)][1]))
+                distance = image_hits.get(other)
+                if other in same_image or (similarity is not None and (
+                    similarity >= TEXT_SIMILARITY_THRESHOLD
+                    or (distance is not None and similarity >= TEXT_SIMILARITY_WITH_IMAGE)
+                )):
+                    matches.append((other, similarity, distance))
+            return sorted(matches, key=lambda m: (-(m[1] or 0), m[2] if m[2] is not None else 64))
+
+    def __len__(self):
+        return len(self._docs)
+
+
+def _pack(values):
+    return array("Q", values).tobytes()
+
+
+def _unpack(blob):
+    values = array("Q")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _load_new(index, db_path):
+    """Add Document_Signatures rows written since the last load, by this or any other process.
+
+    INSERT OR REPLACE gives a re-registered document a new rowid, so replaced
+    rows are picked up too. Rows from before the Shingles column have no
+    text to compare and match on page images only.
+    """
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT rowid, Email, Document_Type, Page_Hashes, Shingles FROM Document_Signatures "
+        "WHERE rowid > ? ORDER BY rowid", (index.last_rowid,)
+    ).fetchall()
+    conn.close()
+    if rows:
+        index.add_many([(email, doc_type, _unpack(pages), _unpack(shingles or b""))
+                        for _, email, doc_type, pages, shingles in rows])
+        index.last_rowid = rows[-1][0]
+
+
+def _deletions(db_path):
+    conn = sqlite3.connect(db_path)
+    deletions = conn.execute("SELECT Deletions FROM Duplicate_Index_State WHERE Id = 1").fetchone()[0]
+    conn.close()
+    return deletions
+
+
+def get_index(db_path=DB_PATH):
+    """Process-wide index, loaded once from Document_Signatures and topped up on every call.
+
+    After any deletion (by this or another process) it is reloaded in full.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            init_duplicate_tables(db_path)
+        deletions = _deletions(db_path)
+        if _index is None or _index.deletions != deletions:
+            _index = DuplicateIndex()
+            _index.deletions = deletions
+        _load_new(_index, db_path)
+    return _index
+
+
+# -------------------------
+# Ingest hook
+# -------------------------
+def register_document(email, doc_type, images, text, db_path=DB_PATH):
+    """Fingerprint an uploaded document, record it and flag near-duplicates held by other emails"""
+    page_hashes = [page_hash(img) for img in images]
+    hashes = shingle_hashes(text)
+    index = get_index(db_path)
+    matches = index.find_matches(email, doc_type, page_hashes, hashes)
+
+    now = datetime.now()
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT OR REPLACE INTO Document_Signatures (Email, Document_Type, Page_Hashes, MinHash, Shingles, Updated_At)
+        VALUES (?, ?, ?, x'', ?, ?)
+    """, (email, doc_type, _pack(page_hashes), _pack(hashes), now))
+    cursor.execute("DELETE FROM Duplicate_Document_Flags WHERE Email=? AND Document_Type=?", (email, doc_type))
+    cursor.executemany("""
+        INSERT OR REPLACE INTO Duplicate_Document_Flags
+            (Email, Document_Type, Matched_Email, Text_Similarity, Image_Distance, Flagged_At)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(email, doc_type, other, similarity, distance, now) for other, similarity, distance in matches])
+    conn.commit()
+    conn.close()
+
+    index.add(email, doc_type, page_hashes, hashes)
+    return matches
+
+
+def forget_applicants(emails, db_path=DB_PATH):
+    """Drop the signatures (and, by trigger, the flags) of applicants whose documents were deleted"""
+    emails = list(emails)
+    conn = sqlite3.connect(db_path, timeout=30)
+    for i in range(0, len(emails), 500):
+        batch = emails[i:i + 500]
+        conn.execute(f"DELETE FROM Document_Signatures WHERE Email IN ({','.join('?' * len(batch))})", batch)
+    conn.commit()
+    conn.close()
+    return len(emails)
+
+
+def fetch_flags(email, db_path=DB_PATH):
+    """Duplicate flags recorded for one applicant's documents"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT Document_Type, Matched_Email, Text_Similarity, Image_Distance
+        FROM Duplicate_Document_Flags WHERE Email=? ORDER BY Document_Type
+    """, (email,))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
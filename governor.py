@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config import OCR_SLOTS, MAX_QUEUED_SUBMISSIONS, JOB_MEMORY_MB, MIN_FREE_MEMORY_MB
+import metrics
+
+# -------------------------
+# Document processing governor
+# -------------------------
+# One instance per server process, shared by every Streamlit session (the
+# module outlives reruns). A submission's OCR + embedding work runs only
+# while it holds one of a fixed number of slots. Beyond that, submissions
+# wait in FIFO order, and only while the waiting line is short enough;
+# after that they are turned away with an estimated wait. A slot is also
+# held back while the host is short of memory, so bursts queue instead of
+# pushing the machine into swap.
+
+
+class Busy(Exception):
+    """Raised when the waiting line is full; `wait` is the estimated wait in seconds"""
+
+    def __init__(self, wait):
+        self.wait = wait
+        super().__init__(f"Document processing is at capacity, try again in about {wait:.0f}s")
+
+
+def available_memory_mb():
+    """MemAvailable from /proc/meminfo, or None where it does not exist"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        return None
+    return None
+
+
+class Governor:
+    def __init__(self, slots=OCR_SLOTS, max_queue=MAX_QUEUED_SUBMISSIONS,
+                 job_memory_mb=JOB_MEMORY_MB, min_free_mb=MIN_FREE_MEMORY_MB):
+        self.slots = max(1, slots)
+        self.max_queue = max_queue
+        self.job_memory_mb = job_memory_mb
+        self.min_free_mb = min_free_mb
+        self.running = 0
+        self.queue = deque()
+        self.avg_seconds = 10.0  # running average job time, for wait estimates
+        self._cond = threading.Condition()
+
+    def estimated_wait(self, position):
+        """Seconds until the job at 0-based queue `position` should start"""
+        return (position // self.slots + 1) * self.avg_seconds
+
+    def _memory_ok(self):
+        if self.running == 0:
+            return True  # never stall completely
+        available = available_memory_mb()
+        return available is None or available >= self.min_free_mb + self.job_memory_mb
+
+    def _admissible(self, ticket):
+        return (self.running < self.slots and (not self.queue or self.queue[0] is ticket)
+                and self._memory_ok())
+
+    def _publish(self):
+        metrics.gauge("admission_governor_running", "Document jobs holding a slot").set(self.running)
+        metrics.gauge("admission_governor_queue_depth", "Document jobs waiting for a slot").set(len(self.queue))
+
+    @contextmanager
+    def slot(self, on_wait=None, poll=0.5):
+        """Hold a processing slot for the body of the with-block.
+
+        on_wait(position, estimated_seconds) is called whenever the caller's
+        place in line or estimate changes (position starts at 1).
+        """
+        ticket = object()
+        queued_at = time.perf_counter()
+        with self._cond:
+            admitted = self._admissible(ticket)
+            if admitted:
+                self.running += 1
+            elif len(self.queue) >= self.max_queue:
+                metrics.counter("admission_governor_rejected_total", "Submissions turned away").inc()
+                raise Busy(self.estimated_wait(len(self.queue)))
+            else:
+                self.queue.append(ticket)
+            self._publish()
+
+        last = None
+        try:
+            while not admitted:
+                with self._cond:
+                    if self._admissible(ticket):
+                        self.queue.popleft()
+                        self.running += 1
+                        self._publish()
+                        break
+                    position = self.queue.index(ticket)
+                    estimate = self.estimated_wait(position)
+                if on_wait and (position, round(estimate)) != last:
+                    last = (position, round(estimate))
+                    on_wait(position + 1, estimate)
+                with self._cond:
+                    self._cond.wait(poll)
+        except BaseException:
+            # e.g. Streamlit stopping the script because the student left the page
+            with self._cond:
+                if ticket in self.queue:
+                    self.queue.remove(ticket)
+                self._publish()
+                self._cond.notify_all()
+            raise
+        metrics.histogram("admission_governor_wait_seconds", "Time submissions waited for a slot").observe(
+            time.perf_counter() - queued_at)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.running -= 1
+                self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * (time.perf_counter() - start)
+                self._publish()
+                self._cond.notify_all()
+
+
+GOVERNOR = Governor()
@@ -274,194 +274,87 @@ elif st.session_state.page == "form":
                 st.success(f"Application submitted! Regn_ID: {regn_id}")'''
 
 import streamlit as st
-import sqlite3
-import hashlib
+import streamlit.components.v1 as components
 from datetime import datetime
-import os
-import pytesseract
-from pdf2image import convert_from_bytes
-from PIL import Image
-import chromadb
-from chromadb.utils import embedding_functions
-
-# Paths
-LOGIN_DB_PATH = "database/admissions.db"
-DATA_DB_PATH = "database/admissions.db"
-VECTOR_DB_PATH = "vector_db"
-
-# DB Setup
-os.makedirs(os.path.dirname(LOGIN_DB_PATH), exist_ok=True)
-os.makedirs(os.path.dirname(DATA_DB_PATH), exist_ok=True)
-os.makedirs(VECTOR_DB_PATH, exist_ok=True)
-
-chroma_client = chromadb.PersistentClient(path=VECTOR_DB_PATH)
-collection = chroma_client.get_or_create_collection(
-    name="student_documents",
-    embedding_function=embedding_functions.DefaultEmbeddingFunction()
+import allocation
+import change_tracking
+import metrics
+import portal_backend
+import sessions
+from config import METRICS_PORT, SESSION_HOURS
+from governor import Busy
+from portal_backend import (
+    DATA_DB_PATH, init_login_db, verify_user, add_user, reset_password,
+    fetch_student_data, upsert_student_data, update_documents
 )
 
-# ----------------- LOGIN DB INIT -----------------
-def init_login_db():
-    conn = sqlite3.connect(LOGIN_DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS Login_Credentials (
-            Email TEXT PRIMARY KEY,
-            Hashed_Password TEXT NOT NULL
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-# ----------------- AUTH HELPERS -----------------
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def verify_user(email, password):
-    conn = sqlite3.connect(LOGIN_DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT Hashed_Password FROM Login_Credentials WHERE Email=?", (email,))
-    result = c.fetchone()
-    conn.close()
-    if result:
-        return result[0] == hash_password(password)
-    return False
-
-def add_user(email, password):
-    conn = sqlite3.connect(LOGIN_DB_PATH)
-    c = conn.cursor()
-    try:
-        c.execute("INSERT INTO Login_Credentials VALUES (?, ?)", (email, hash_password(password)))
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        return False
-    finally:
-        conn.close()
-
-def reset_password(email, new_pass):
-    conn = sqlite3.connect(LOGIN_DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT * FROM Login_Credentials WHERE Email=?", (email,))
-    if c.fetchone():
-        c.execute("UPDATE Login_Credentials SET Hashed_Password=? WHERE Email=?", (hash_password(new_pass), email))
-        conn.commit()
-        conn.close()
-        return True
-    conn.close()
-    return False
-
-# ----------------- OCR -----------------
-def extract_text_from_scanned_pdf(uploaded_file):
-    try:
-        images = convert_from_bytes(uploaded_file.read())
-        text = ""
-        for img in images:
-            text += pytesseract.image_to_string(img)
-        return text
-    except Exception as e:
-        st.error(f"OCR failed: {str(e)}")
-        return ""
-
-# ----------------- DB OPERATIONS -----------------
-def fetch_student_data(email):
-    conn = sqlite3.connect(DATA_DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT Name, Mobile_Number FROM Primary_Data WHERE Email=?", (email,))
-    primary = cursor.fetchone()
-
-    cursor.execute("""
-        SELECT Aadhar_Number, DOB, Class_10_Year, Class_10_Avg_Marks, Class_12_Year,
-               Class_12_Physics, Class_12_Maths, Class_12_Chemistry, JEE_Year,
-               JEE_Rank, Stream_Applied
-        FROM Application_Data WHERE Email=?
-    """, (email,))
-    app = cursor.fetchone()
-    conn.close()
+# OCR failures are shown on the page of the session that hit them
+portal_backend.report_error = st.error
 
-    if primary and app:
-        return {
-            "Name": primary[0],
-            "Mobile": primary[1],
-            "Aadhar": app[0],
-            "DOB": app[1],
-            "Class10Year": app[2],
-            "Class10Marks": app[3],
-            "Class12Year": app[4],
-            "Class12Physics": app[5],
-            "Class12Maths": app[6],
-            "Class12Chemistry": app[7],
-            "JEEYear": app[8],
-            "JEERank": app[9],
-            "Stream": app[10],
-        }
-    return None
-
-def upsert_student_data(email, name, mobile, aadhar, dob, class_10_year, class_10_marks,
-                        class_12_year, class_12_physics, class_12_maths, class_12_chemistry,
-                        jee_year, jee_rank, stream):
-    conn = sqlite3.connect(DATA_DB_PATH)
-    cursor = conn.cursor()
+# ----------------- STREAMLIT APP -----------------
+st.set_page_config(page_title="Admission Portal", layout="wide")
+metrics.start_metrics_server(METRICS_PORT)
 
-    cursor.execute("SELECT Email FROM Primary_Data WHERE Email=?", (email,))
-    exists = cursor.fetchone()
 
-    try:
-        if exists:
-            cursor.execute("UPDATE Primary_Data SET Name=?, Mobile_Number=? WHERE Email=?",
-                           (name, mobile, email))
-            cursor.execute("""
-                UPDATE Application_Data SET
-                    Aadhar_Number=?, DOB=?, Class_10_Year=?, Class_10_Avg_Marks=?,
-                    Class_12_Year=?, Class_12_Physics=?, Class_12_Maths=?, Class_12_Chemistry=?,
-                    JEE_Year=?, JEE_Rank=?, Stream_Applied=?, last_validation=?
-                WHERE Email=?
-            """, (
-                aadhar, dob, class_10_year, class_10_marks,
-                class_12_year, class_12_physics, class_12_maths, class_12_chemistry,
-                jee_year, jee_rank, stream, datetime.now(), email
-            ))
-        else:
-            cursor.execute("INSERT INTO Primary_Data (Email, Name, Mobile_Number) VALUES (?, ?, ?)",
-                           (email, name, mobile))
-            cursor.execute("""
-                INSERT INTO Application_Data (
-                    Email, Aadhar_Number, DOB, Class_10_Year, Class_10_Avg_Marks,
-                    Class_12_Year, Class_12_Physics, Class_12_Maths, Class_12_Chemistry,
-                    JEE_Year, JEE_Rank, Stream_Applied, last_validation
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                email, aadhar, dob, class_10_year, class_10_marks,
-                class_12_year, class_12_physics, class_12_maths, class_12_chemistry,
-                jee_year, jee_rank, stream, datetime.now()
-            ))
-            cursor.execute("INSERT INTO Admission_result (Email) VALUES (?)", (email,))
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+@st.cache_resource
+def init_portal_db():
+    # once per server process, not on every rerun; expired sessions are
+    # purged by main.init_sql_db / `python sessions.py purge`
+    init_login_db()
+    allocation.init_allocation_tables(DATA_DB_PATH)
+    change_tracking.init_change_tracking(DATA_DB_PATH)
+    sessions.init_sessions(DATA_DB_PATH)
 
-def update_documents(email, documents):
-    doc_types = ["aadhar_card", "class_10_marksheet", "class_12_marksheet", "jee_rank_card"]
-    for doc_type, doc_file in zip(doc_types, documents):
-        if doc_file is not None:
-            text = extract_text_from_scanned_pdf(doc_file)
-            collection.upsert(
-                documents=[text],
-                metadatas=[{"email": email, "document_type": doc_type}],
-                ids=[f"{email}_{doc_type}"]
-            )
 
-# ----------------- STREAMLIT APP -----------------
-st.set_page_config(page_title="Admission Portal", layout="wide")
-init_login_db()
+init_portal_db()
 
 if "page" not in st.session_state:
     st.session_state.page = "login"
 
+# ----------------- SESSION -----------------
+# The signed session token lives in this browser session's state and in a
+# cookie, never in the URL. A refresh starts a new Streamlit session, which
+# picks the token up from the cookie sent with the page's websocket. Every
+# rerun re-checks it, which is an in-memory lookup; an expired or revoked
+# token sends the student back to login.
+def browser_cookie_token():
+    try:
+        from streamlit.web.server.websocket_headers import _get_websocket_headers
+        headers = _get_websocket_headers() or {}
+    except Exception:  # not served by `streamlit run`, e.g. in tests
+        return None
+    return sessions.cookie_token(headers.get("Cookie"))
+
+
+def write_cookie(value, max_age):
+    # components run in a same-origin iframe, so this sets the portal's own cookie
+    components.html(f"<script>document.cookie = '{sessions.COOKIE_NAME}={value}; path=/; "
+                    f"max-age={max_age}; SameSite=Strict';</script>", height=0)
+
+
+if "session_token" not in st.session_state:
+    st.session_state.session_token = st.query_params.get("session") or browser_cookie_token()
+    if "session" in st.query_params:
+        # links from when the token rode in the URL: move it into the cookie
+        del st.query_params["session"]
+        st.session_state.cookie = (st.session_state.session_token, int(SESSION_HOURS * 3600))
+if st.session_state.get("cookie"):
+    write_cookie(*st.session_state.cookie)
+    st.session_state.cookie = None
+
+token = st.session_state.session_token
+session_email = sessions.verify_session(token, DATA_DB_PATH) if token else None
+if session_email:
+    st.session_state.email = session_email
+    if st.session_state.page == "login":
+        st.session_state.page = "form"
+else:
+    if token:
+        st.session_state.session_token = None
+        write_cookie("", 0)
+    if st.session_state.page == "form":
+        st.session_state.page = "login"
+
 # ----------------- LOGIN -----------------
 if st.session_state.page == "login":
     st.title("🔐 Login to Admission Portal")
@@ -470,6 +363,8 @@ if st.session_state.page == "login":
 
     if st.button("Login"):
         if verify_user(email, password):
+            st.session_state.session_token = sessions.create_session(email, db_path=DATA_DB_PATH)
+            st.session_state.cookie = (st.session_state.session_token, int(SESSION_HOURS * 3600))
             st.session_state.page = "form"
             st.session_state.email = email
             st.rerun()
@@ -513,6 +408,7 @@ elif st.session_state.page == "forgot":
 
     if st.button("Reset Password"):
         if reset_password(email, new_pass):
+            sessions.revoke_user(email, DATA_DB_PATH)
             st.success("Password updated successfully")
             st.session_state.page = "login"
             st.rerun()
@@ -527,7 +423,12 @@ elif st.session_state.page == "forgot":
 elif st.session_state.page == "form":
     st.title("🎓 Student Application Form (OCR Enabled)")
     email = st.session_state.email
-    existing_data = fetch_student_data(email)
+    # read once per login; reruns of the form reuse it until the next submit
+    if st.session_state.get("profile_email") != email:
+        st.session_state.profile = fetch_student_data(email)
+        st.session_state.preferences = allocation.get_preferences(email, DATA_DB_PATH)
+        st.session_state.profile_email = email
+    existing_data = st.session_state.profile
 
     with st.form("student_form"):
         st.header("Personal Details")
@@ -551,6 +452,9 @@ elif st.session_state.page == "form":
         jee_year = st.number_input("JEE Year", 2000, 2100, value=int(existing_data["JEEYear"]) if existing_data else 2024)
         jee_rank = st.number_input("JEE Rank", 0, value=int(existing_data["JEERank"]) if existing_data else 0)
         stream = st.selectbox("Stream Applied", ["CS", "ECE", "Mechanical", "Civil"], index=["CS", "ECE", "Mechanical", "Civil"].index(existing_data["Stream"]) if existing_data else 0)
+        other_streams = st.multiselect("Other streams you would accept (in order of preference)",
+                                       ["CS", "ECE", "Mechanical", "Civil"],
+                                       default=st.session_state.preferences[1:])
 
         st.header("Upload/Replace Documents")
         aadhar_doc = st.file_uploader("Aadhar Card (PDF)", type="pdf")
@@ -559,17 +463,39 @@ elif st.session_state.page == "form":
         jee_rank_doc = st.file_uploader("JEE Rank Card", type="pdf")
 
         if st.form_submit_button("Submit / Update Application"):
-            upsert_student_data(
-                email, name, mobile, aadhar, dob, class_10_year, class_10_marks,
-                class_12_year, class_12_physics, class_12_maths, class_12_chemistry,
-                jee_year, jee_rank, stream
-            )
-            update_documents(email, [aadhar_doc, class_10_doc, class_12_doc, jee_rank_doc])
-            st.success("Application submitted/updated successfully.")
+            waiting = st.empty()
+            with metrics.timed("admission_submission_seconds", "End-to-end form submission latency"):
+                upsert_student_data(
+                    email, name, mobile, aadhar, dob, class_10_year, class_10_marks,
+                    class_12_year, class_12_physics, class_12_maths, class_12_chemistry,
+                    jee_year, jee_rank, stream
+                )
+                allocation.set_preferences(email, [stream] + other_streams, DATA_DB_PATH)
+                try:
+                    update_documents(
+                        email, [aadhar_doc, class_10_doc, class_12_doc, jee_rank_doc],
+                        on_wait=lambda position, wait: waiting.info(
+                            f"⏳ Documents queued for processing: you're #{position} in line, about {wait:.0f}s to go")
+                    )
+                    busy = None
+                except Busy as e:
+                    busy = e
+            waiting.empty()
+            st.session_state.profile_email = None
+            if busy:
+                st.warning(f"Your details were saved, but document processing is at capacity. "
+                           f"Please upload your documents again in about {busy.wait:.0f} seconds.")
+            else:
+                st.success("Application submitted/updated successfully.")
 
 #-----------LOGOUT-------------
 elif st.session_state.page == "logout":
+    if token:
+        sessions.revoke_session(token, DATA_DB_PATH)
+    st.session_state.session_token = None
+    st.session_state.cookie = ("", 0)
     st.session_state.email = None
+    st.session_state.profile_email = None
     st.session_state.page = "login"
     st.success("Logged out successfully.")
     st.rerun()
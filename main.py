@@ -1,12 +1,18 @@
 import sqlite3
-import chromadb
-from chromadb.utils import embedding_functions
 import os
 from datetime import datetime
+from duplicate_index import init_duplicate_tables
+from allocation import init_allocation_tables
+from change_tracking import init_change_tracking
+from document_validator import init_validation_tables
+from admin_backend import init_admin_stats
+from sessions import init_sessions, purge_expired
+import vector_maintenance
+from config import DB_PATH, VECTOR_DB_PATH, COLLECTION_NAME
 
-def init_sql_db():
+def init_sql_db(db_path=DB_PATH):
     """Initialize SQLite database with all tracking columns"""
-    conn = sqlite3.connect("database/admissions.db")
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # Login credentials table
@@ -76,14 +82,30 @@ def init_sql_db():
 
     conn.commit()
     conn.close()
+
+    # Document fingerprints for cross-applicant duplicate detection
+    init_duplicate_tables(db_path)
+    # Stream preferences and counselling rounds
+    init_allocation_tables(db_path)
+    # Per-field / per-document fingerprints and check results for incremental re-validation
+    init_change_tracking(db_path)
+    init_validation_tables(db_path)
+    # Trigger-maintained counters and pagination indexes for the admin dashboard
+    init_admin_stats(db_path)
+    # Signed login sessions that survive a page refresh
+    init_sessions(db_path)
+    purge_expired(db_path)
     print("✅ SQLite database initialized with tracking tables.")
 
 
-def init_vector_db():
+def init_vector_db(vector_path=VECTOR_DB_PATH, name=COLLECTION_NAME):
     """Initialize ChromaDB with email-based document mapping"""
-    chroma_client = chromadb.PersistentClient(path="vector_db")
+    import chromadb
+    from chromadb.utils import embedding_functions
+
+    chroma_client = chromadb.PersistentClient(path=vector_path)
     chroma_client.get_or_create_collection(
-        name="student_documents",
+        name=name,
         embedding_function=embedding_functions.DefaultEmbeddingFunction(),
         metadata={"email_based": True}  # Add custom metadata
     )
@@ -91,7 +113,7 @@ def init_vector_db():
 
 def log_status_change(email, status, changed_by="system"):
     """Record status changes in audit log"""
-    conn = sqlite3.connect("database/admissions.db")
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute(
         "INSERT INTO Application_Log (Email, status_change, changed_by) VALUES (?, ?, ?)",
@@ -100,33 +122,35 @@ def log_status_change(email, status, changed_by="system"):
     conn.commit()
     conn.close()
 
-def reset_test_data():
+# Every table holding applicant data; the seat matrix and the session signing key survive a reset
+RESET_TABLES = [
+    "Login_Credentials", "Primary_Data", "Application_Data", "Admission_Results",
+    "Stream_Preferences", "Seat_Allocations", "Counselling_Rounds",
+    "Submission_Fingerprints", "Validation_Checks",
+    "Document_Signatures", "Duplicate_Document_Flags", "Sessions", "Admission_Stats",
+]
+
+def reset_test_data(db_path=DB_PATH, collection=None):
     """Utility function for development - clears test data"""
-    conn = sqlite3.connect("database/admissions.db")
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # Delete data while preserving table structure
-    cursor.execute("DELETE FROM Login_Credentials")
-    cursor.execute("DELETE FROM Primary_Data")
-    cursor.execute("DELETE FROM Application_Data")
-    cursor.execute("DELETE FROM Admission_Results")
-    cursor.execute("DELETE FROM Application_Log")
+    for table in RESET_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+    cursor.execute("UPDATE Admission_Seats SET Available_Seats = Total_Seats")
     
     conn.commit()
     conn.close()
     
-    # Reset vector DB
-    chroma_client = chromadb.PersistentClient(path="vector_db")
-    try:
-        collection = chroma_client.get_collection("student_documents")
-        collection.delete(where={"email": {"$ne": ""}})  # Delete all email-associated docs
-    except:
-        pass
+    # Reset vector DB: Primary_Data is empty now, so every applicant's
+    # documents are orphans and get deleted by id in batches
+    vector_maintenance.reconcile(collection, db_path)
     print("⚠️ All test data reset complete")
 
 if __name__ == "__main__":
-    os.makedirs("database", exist_ok=True)
-    os.makedirs("vector_db", exist_ok=True)
+    os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+    os.makedirs(VECTOR_DB_PATH, exist_ok=True)
     
     # Initialize databases
     init_sql_db()
@@ -0,0 +1,250 @@
+import bisect
+import threading
+import time
+from contextlib import ContextDecorator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# -------------------------
+# Lightweight metrics
+# -------------------------
+# Counters and histograms kept in process memory, exported in Prometheus
+# text format from a local HTTP endpoint and printable as a run summary.
+# Streamlit reruns re-execute the app script but not imported modules, so
+# the registry below lives for the whole server process.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_lock = threading.Lock()
+_metrics = {}  # name -> Counter / Histogram
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in sorted(self.values.items())]
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def set(self, value, **labels):
+        with _lock:
+            self.values[_label_key(labels)] = value
+
+    def render(self):
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in sorted(self.values.items())]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.values = {}  # label key -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def quantile(self, key, q):
+        """Approximate quantile from bucket upper bounds"""
+        series = self.values[key]
+        total = sum(series[:-1])
+        target = q * total
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+            running += count
+            if running >= target:
+                return bound
+        return float("inf")
+
+    def render(self):
+        lines = []
+        for key, series in sorted(self.values.items()):
+            running = 0
+            for bound, count in zip(self.buckets, series):
+                running += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {running}")
+            running += series[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {running}")
+        return lines
+
+
+def _get(cls, name, help_text):
+    metric = _metrics.get(name)
+    if metric is None:
+        with _lock:
+            metric = _metrics.get(name)
+            if metric is None:
+                metric = _metrics[name] = cls(name, help_text)
+    return metric
+
+
+def counter(name, help_text=""):
+    return _get(Counter, name, help_text)
+
+
+def gauge(name, help_text=""):
+    return _get(Gauge, name, help_text)
+
+
+def histogram(name, help_text=""):
+    return _get(Histogram, name, help_text)
+
+
+class timed(ContextDecorator):
+    """Time a block or function into a histogram; failures also count into <name>_errors_total.
+
+        with metrics.timed("admission_ocr_page_seconds"):
+            ...
+
+        @metrics.timed("admission_sqlite_query_seconds", op="verify_user")
+        def verify_user(...):
+    """
+
+    def __init__(self, name, help_text="", **labels):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._local = threading.local()
+
+    def __enter__(self):
+        # a stack per thread, so one decorated function can be re-entered
+        if not hasattr(self._local, "starts"):
+            self._local.starts = []
+        self._local.starts.append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._local.starts.pop()
+        histogram(self.name, self.help).observe(elapsed, **self.labels)
+        if exc_type is not None:
+            counter(f"{self.name.removesuffix('_seconds')}_errors_total").inc(**self.labels)
+        return False
+
+
+class TimedEmbeddingFunction:
+    """Wraps a Chroma embedding function and times every batch"""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __call__(self, input):
+        with timed("admission_embedding_seconds", "Embedding batch latency"):
+            embeddings = self.inner(input)
+        counter("admission_embeddings_total", "Documents embedded").inc(len(input))
+        return embeddings
+
+
+# -------------------------
+# Export
+# -------------------------
+def render_prometheus():
+    lines = []
+    with _lock:
+        for name in sorted(_metrics):
+            metric = _metrics[name]
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def summary():
+    """Plain-text table of every histogram, for printing at the end of a run"""
+    rows = []
+    with _lock:
+        for name in sorted(_metrics):
+            metric = _metrics[name]
+            if not isinstance(metric, Histogram):
+                continue
+            for key, series in sorted(metric.values.items()):
+                count = sum(series[:-1])
+                rows.append((
+                    name.removeprefix("admission_") + _format_labels(key),
+                    count, series[-1], series[-1] / count if count else 0,
+                    metric.quantile(key, 0.5), metric.quantile(key, 0.95),
+                ))
+    if not rows:
+        return "No timings recorded."
+    width = max(len(r[0]) for r in rows)
+    lines = [f"{'stage':<{width}}  {'count':>7}  {'total s':>9}  {'mean s':>8}  {'p50<=':>7}  {'p95<=':>7}"]
+    for label, count, total, mean, p50, p95 in rows:
+        lines.append(f"{label:<{width}}  {count:>7}  {total:>9.3f}  {mean:>8.4f}  {p50:>7g}  {p95:>7g}")
+    return "\n".join(lines)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def start_metrics_server(port=9108, host="127.0.0.1"):
+    """Serve /metrics from a daemon thread; safe to call on every Streamlit rerun"""
+    global _server
+    with _lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _Handler)
+            except OSError as e:
+                print(f"⚠️ Metrics endpoint not started on {host}:{port}: {e}")
+                _server = False
+                return None
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server or None
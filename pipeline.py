@@ -0,0 +1,253 @@
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+
+from config import DB_PATH
+import document_validator
+import allocation
+import metrics
+
+# -------------------------
+# Admission pipeline orchestrator
+# -------------------------
+# Runs ingest -> validate -> shortlist -> notify over admissions.db. Every
+# stage reads its pending work from the tracking columns and checkpoints
+# each applicant as soon as it is done, so a crashed or interrupted run can
+# simply be started again and continues where it stopped.
+
+
+def connect():
+    return sqlite3.connect(DB_PATH, timeout=30)
+
+
+def _fetch_column(sql, params=()):
+    conn = connect()
+    rows = [row[0] for row in conn.execute(sql, params)]
+    conn.close()
+    return rows
+
+
+# -------------------------
+# Ingest
+# -------------------------
+def pending_ingest(options):
+    """New applications without a results row, and applications edited since validation"""
+    return _fetch_column("""
+        SELECT a.Email FROM Application_Data a
+        LEFT JOIN Admission_Results r ON r.Email = a.Email
+        WHERE r.Email IS NULL OR a.application_edited = TRUE
+        ORDER BY a.Email
+    """)
+
+
+def run_ingest(emails, options):
+    conn = connect()
+    cursor = conn.cursor()
+    for email in emails:
+        cursor.execute("INSERT OR IGNORE INTO Admission_Results (Email) VALUES (?)", (email,))
+        cursor.execute("SELECT application_edited FROM Application_Data WHERE Email=?", (email,))
+        row = cursor.fetchone()
+        if row and row[0]:
+            # an edited application is decided again from scratch: any seat
+            # it held goes back and the old result no longer stands
+            allocation.release_seat(cursor, email)
+            cursor.execute("UPDATE Admission_Results SET shortlisting_done=FALSE WHERE Email=?", (email,))
+            cursor.execute("""
+                UPDATE Application_Data SET
+                    application_validation_done=FALSE,
+                    application_validation_status_email_sent=FALSE,
+                    application_edited=FALSE
+                WHERE Email=?
+            """, (email,))
+        conn.commit()
+    conn.close()
+    return len(emails)
+
+
+# -------------------------
+# Validate
+# -------------------------
+_collection = None
+_collection_lock = threading.Lock()
+
+
+def _get_collection():
+    global _collection
+    with _collection_lock:
+        if _collection is None:
+            _collection = document_validator.get_collection()
+    return _collection
+
+
+def pending_validate(options):
+    return _fetch_column(
+        "SELECT Email FROM Application_Data WHERE application_validation_done = FALSE ORDER BY Email"
+    )
+
+
+def run_validate(emails, options):
+    results = document_validator.validate_batch(emails, _get_collection(), DB_PATH)
+    return len(results)
+
+
+# -------------------------
+# Shortlist
+# -------------------------
+def pending_shortlist(options):
+    """A counselling round is due when applicants are undecided or seats were released"""
+    return ["round"] if allocation.round_pending(DB_PATH) else []
+
+
+def run_shortlist(rounds, options):
+    summary = allocation.run_round(DB_PATH)
+    print(f"🎯 Round {summary['round']}: {summary['allocated']}/{summary['applicants']} allocated, "
+          f"{summary['changed']} changed, {summary['upgraded']} upgraded in {summary['seconds']}s")
+    return summary["changed"]
+
+
+# -------------------------
+# Notify
+# -------------------------
+_thread_state = threading.local()
+
+
+def _gmail_service():
+    # googleapiclient services are not thread-safe, so each worker builds its own
+    if getattr(_thread_state, "service", None) is None:
+        import communicator
+        _thread_state.service = communicator.authenticate_gmail()
+    return _thread_state.service
+
+
+def pending_notify(options):
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT Email, 'validation' FROM Application_Data
+        WHERE application_validation_done = TRUE AND application_valid = FALSE
+          AND application_validation_status_email_sent = FALSE
+    """)
+    items = cursor.fetchall()
+    cursor.execute("""
+        SELECT r.Email, 'result' FROM Admission_Results r
+        JOIN Application_Data a ON a.Email = r.Email
+        WHERE r.shortlisting_done = TRUE AND r.acceptance_status_email_sent = FALSE
+    """)
+    items += cursor.fetchall()
+    conn.close()
+    return items
+
+
+def run_notify(items, options):
+    conn = connect()
+    cursor = conn.cursor()
+    for email, kind in items:
+        if kind == "validation":
+            cursor.execute("SELECT error_observed FROM Application_Data WHERE Email=?", (email,))
+            issues = [i for i in (cursor.fetchone()[0] or "").split("; ") if i]
+            student = {"email": email, "status": "rejected", "issues": issues}
+        else:
+            cursor.execute("SELECT acceptance_status FROM Admission_Results WHERE Email=?", (email,))
+            status = "accepted" if cursor.fetchone()[0] else "rejected"
+            student = {"email": email, "status": status, "issues": []}
+
+        if options.dry_run:
+            print(f"📝 [dry run] {kind} email to {email}: {student['status']}")
+            continue
+
+        import communicator
+        communicator.notify_student(_gmail_service(), student)
+        if kind == "validation":
+            cursor.execute("UPDATE Application_Data SET application_validation_status_email_sent=TRUE WHERE Email=?",
+                           (email,))
+        else:
+            cursor.execute("UPDATE Admission_Results SET acceptance_status_email_sent=TRUE WHERE Email=?", (email,))
+            cursor.execute("UPDATE Application_Data SET application_validation_status_email_sent=TRUE WHERE Email=?",
+                           (email,))
+        conn.commit()
+    conn.close()
+    return len(items)
+
+
+# -------------------------
+# DAG
+# -------------------------
+STAGES = {
+    "ingest": {"after": [], "pending": pending_ingest, "run": run_ingest},
+    "validate": {"after": ["ingest"], "pending": pending_validate, "run": run_validate},
+    "shortlist": {"after": ["validate"], "pending": pending_shortlist, "run": run_shortlist},
+    "notify": {"after": ["shortlist"], "pending": pending_notify, "run": run_notify},
+}
+
+
+def run_stage(name, options):
+    """Run one stage over its pending work in parallel chunks"""
+    stage = STAGES[name]
+    items = stage["pending"](options)
+    if not items:
+        print(f"⏭️  {name}: nothing pending")
+        return 0
+
+    chunks = [items[i:i + options.chunk_size] for i in range(0, len(items), options.chunk_size)]
+    print(f"▶️  {name}: {len(items)} pending in {len(chunks)} chunk(s)")
+    start = time.time()
+    done = 0
+    with ThreadPoolExecutor(max_workers=options.workers) as pool:
+        run = metrics.timed("admission_stage_chunk_seconds", "Pipeline chunk latency", stage=name)(stage["run"])
+        futures = [pool.submit(run, chunk, options) for chunk in chunks]
+        for future in as_completed(futures):
+            done += future.result()
+    print(f"✅ {name}: {done} processed in {time.time() - start:.1f}s")
+    return done
+
+
+def run_pipeline(selected, options):
+    """Run the selected stages in dependency order; independent stages run side by side"""
+    remaining = {name: [d for d in STAGES[name]["after"] if d in selected] for name in selected}
+    finished = set()
+    with ThreadPoolExecutor(max_workers=len(selected) or 1) as pool:
+        running = {}
+        while remaining or running:
+            for name in [n for n, deps in remaining.items() if all(d in finished for d in deps)]:
+                running[pool.submit(run_stage, name, options)] = name
+                del remaining[name]
+            if not running:
+                raise RuntimeError(f"Unresolvable stage dependencies: {sorted(remaining)}")
+            future = next(as_completed(running))
+            name = running.pop(future)
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ {name} failed: {e}. Re-run to resume from the last checkpoint.")
+                wait(running)
+                return False
+            finished.add(name)
+    return True
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the admission pipeline (ingest -> validate -> shortlist -> notify)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="comma separated subset of stages to run (default: all)")
+    parser.add_argument("--workers", type=int, default=4, help="parallel chunks per stage")
+    parser.add_argument("--chunk-size", type=int, default=50, help="applicants per chunk")
+    parser.add_argument("--dry-run", action="store_true", help="print notifications instead of sending them")
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="serve Prometheus metrics on this port while the run is in progress")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    options = parse_args()
+    selected = [s.strip() for s in options.stages.split(",") if s.strip()]
+    unknown = [s for s in selected if s not in STAGES]
+    if unknown:
+        sys.exit(f"Unknown stage(s): {', '.join(unknown)}")
+    if options.metrics_port:
+        metrics.start_metrics_server(options.metrics_port)
+    ok = run_pipeline(selected, options)
+    print("\n📊 Run summary\n" + metrics.summary())
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,265 @@
+import sqlite3
+import hashlib
+from datetime import datetime
+import os
+import threading
+import duplicate_index
+import change_tracking
+import metrics
+from governor import GOVERNOR
+from config import DB_PATH, VECTOR_DB_PATH, COLLECTION_NAME, DOC_TYPES
+
+# ----------------- PORTAL DATA LAYER -----------------
+# Everything the student portal does besides rendering: auth, OCR, and the
+# SQLite / Chroma writes. Kept free of Streamlit so it can be driven from
+# benchmarks and load tests as well as from login_app.py.
+# pytesseract, pdf2image and chromadb are imported on first use: login,
+# sign-up and password reset never touch them, and chromadb alone costs
+# about a second of start-up.
+
+# Paths
+LOGIN_DB_PATH = DB_PATH
+DATA_DB_PATH = DB_PATH
+
+# DB Setup
+os.makedirs(os.path.dirname(DATA_DB_PATH) or ".", exist_ok=True)
+os.makedirs(VECTOR_DB_PATH, exist_ok=True)
+
+# Created by get_collection(); benchmarks may assign their own collection here
+chroma_client = None
+collection = None
+_chroma_lock = threading.Lock()
+
+# Concurrency is bounded by the governor's slots, so each Tesseract process
+# sticks to one thread instead of every process grabbing all cores
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+# Where OCR failures are reported; login_app points this at st.error
+report_error = print
+
+# ----------------- LOGIN DB INIT -----------------
+def init_login_db():
+    conn = sqlite3.connect(LOGIN_DB_PATH)
+    c = conn.cursor()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS Login_Credentials (
+            Email TEXT PRIMARY KEY,
+            Hashed_Password TEXT NOT NULL
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+# ----------------- AUTH HELPERS -----------------
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+@metrics.timed("admission_sqlite_query_seconds", "SQLite query latency", op="verify_user")
+def verify_user(email, password):
+    conn = sqlite3.connect(LOGIN_DB_PATH)
+    c = conn.cursor()
+    c.execute("SELECT Hashed_Password FROM Login_Credentials WHERE Email=?", (email,))
+    result = c.fetchone()
+    conn.close()
+    if result:
+        return result[0] == hash_password(password)
+    return False
+
+@metrics.timed("admission_sqlite_query_seconds", "SQLite query latency", op="add_user")
+def add_user(email, password):
+    conn = sqlite3.connect(LOGIN_DB_PATH)
+    c = conn.cursor()
+    try:
+        c.execute("INSERT INTO Login_Credentials VALUES (?, ?)", (email, hash_password(password)))
+        conn.commit()
+        return True
+    except sqlite3.IntegrityError:
+        return False
+    finally:
+        conn.close()
+
+@metrics.timed("admission_sqlite_query_seconds", "SQLite query latency", op="reset_password")
+def reset_password(email, new_pass):
+    conn = sqlite3.connect(LOGIN_DB_PATH)
+    c = conn.cursor()
+    c.execute("SELECT * FROM Login_Credentials WHERE Email=?", (email,))
+    if c.fetchone():
+        c.execute("UPDATE Login_Credentials SET Hashed_Password=? WHERE Email=?", (hash_password(new_pass), email))
+        conn.commit()
+        conn.close()
+        return True
+    conn.close()
+    return False
+
+# ----------------- VECTOR STORE -----------------
+def get_chroma_client():
+    global chroma_client
+    with _chroma_lock:
+        if chroma_client is None:
+            import chromadb
+            chroma_client = chromadb.PersistentClient(path=VECTOR_DB_PATH)
+    return chroma_client
+
+def get_collection():
+    global collection
+    if collection is None:
+        from chromadb.utils import embedding_functions
+        import vector_maintenance
+        client = get_chroma_client()
+        with _chroma_lock:
+            if collection is None:
+                vector_maintenance.recover_interrupted_compact(client, COLLECTION_NAME)
+                collection = client.get_or_create_collection(
+                    name=COLLECTION_NAME,
+                    embedding_function=metrics.TimedEmbeddingFunction(embedding_functions.DefaultEmbeddingFunction())
+                )
+    return collection
+
+# ----------------- OCR -----------------
+def rasterize_pdf(uploaded_file):
+    from pdf2image import convert_from_bytes
+    try:
+        with metrics.timed("admission_pdf_rasterize_seconds", "PDF to image conversion latency"):
+            return convert_from_bytes(uploaded_file.read())
+    except Exception as e:
+        report_error(f"OCR failed: {str(e)}")
+        return []
+
+def extract_text_from_images(images):
+    import pytesseract
+    try:
+        text = ""
+        for img in images:
+            with metrics.timed("admission_ocr_page_seconds", "Tesseract latency per page"):
+                text += pytesseract.image_to_string(img)
+        return text
+    except Exception as e:
+        report_error(f"OCR failed: {str(e)}")
+        return ""
+
+def extract_text_from_scanned_pdf(uploaded_file):
+    return extract_text_from_images(rasterize_pdf(uploaded_file))
+
+# ----------------- DB OPERATIONS -----------------
+@metrics.timed("admission_sqlite_query_seconds", "SQLite query latency", op="fetch_student_data")
+def fetch_student_data(email):
+    conn = sqlite3.connect(DATA_DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT Name, Mobile_Number FROM Primary_Data WHERE Email=?", (email,))
+    primary = cursor.fetchone()
+
+    cursor.execute("""
+        SELECT Aadhar_Number, DOB, Class_10_Year, Class_10_Avg_Marks, Class_12_Year,
+               Class_12_Physics, Class_12_Maths, Class_12_Chemistry, JEE_Year,
+               JEE_Rank, Stream_Applied
+        FROM Application_Data WHERE Email=?
+    """, (email,))
+    app = cursor.fetchone()
+    conn.close()
+
+    if primary and app:
+        return {
+            "Name": primary[0],
+            "Mobile": primary[1],
+            "Aadhar": app[0],
+            "DOB": app[1],
+            "Class10Year": app[2],
+            "Class10Marks": app[3],
+            "Class12Year": app[4],
+            "Class12Physics": app[5],
+            "Class12Maths": app[6],
+            "Class12Chemistry": app[7],
+            "JEEYear": app[8],
+            "JEERank": app[9],
+            "Stream": app[10],
+        }
+    return None
+
+@metrics.timed("admission_sqlite_query_seconds", "SQLite query latency", op="upsert_student_data")
+def upsert_student_data(email, name, mobile, aadhar, dob, class_10_year, class_10_marks,
+                        class_12_year, class_12_physics, class_12_maths, class_12_chemistry,
+                        jee_year, jee_rank, stream):
+    conn = sqlite3.connect(DATA_DB_PATH)
+    cursor = conn.cursor()
+
+    # decided on the application: an account carried over from an earlier
+    # cohort (cohorts.py) has a profile here but no application yet
+    cursor.execute("SELECT Email FROM Application_Data WHERE Email=?", (email,))
+    exists = cursor.fetchone()
+
+    fields = dict(zip(
+        change_tracking.PRIMARY_FIELDS + change_tracking.APPLICATION_FIELDS,
+        [name, mobile, aadhar, dob, class_10_year, class_10_marks, class_12_year,
+         class_12_physics, class_12_maths, class_12_chemistry, jee_year, jee_rank, stream]
+    ))
+
+    try:
+        changed = change_tracking.record_fields(cursor, email, fields)
+        if exists:
+            # only the columns whose fingerprint changed are rewritten
+            primary = [f for f in changed if f in change_tracking.PRIMARY_FIELDS]
+            application = [f for f in changed if f in change_tracking.APPLICATION_FIELDS]
+            if primary:
+                cursor.execute(f"UPDATE Primary_Data SET {', '.join(f + '=?' for f in primary)} WHERE Email=?",
+                               [fields[f] for f in primary] + [email])
+            if changed:
+                cursor.execute(f"""
+                    UPDATE Application_Data SET
+                        {''.join(f + '=?, ' for f in application)}last_validation=?, application_edited=TRUE
+                    WHERE Email=?
+                """, [fields[f] for f in application] + [datetime.now(), email])
+        else:
+            cursor.execute("""
+                INSERT INTO Primary_Data (Email, Name, Mobile_Number) VALUES (?, ?, ?)
+                ON CONFLICT(Email) DO UPDATE SET Name=excluded.Name, Mobile_Number=excluded.Mobile_Number
+            """, (email, name, mobile))
+            cursor.execute("""
+                INSERT INTO Application_Data (
+                    Email, Aadhar_Number, DOB, Class_10_Year, Class_10_Avg_Marks,
+                    Class_12_Year, Class_12_Physics, Class_12_Maths, Class_12_Chemistry,
+                    JEE_Year, JEE_Rank, Stream_Applied, last_validation
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                email, aadhar, dob, class_10_year, class_10_marks,
+                class_12_year, class_12_physics, class_12_maths, class_12_chemistry,
+                jee_year, jee_rank, stream, datetime.now()
+            ))
+            cursor.execute("INSERT OR IGNORE INTO Admission_Results (Email) VALUES (?)", (email,))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+def update_documents(email, documents, on_wait=None):
+    """OCR, embed and register changed documents; the heavy part waits for a governor slot.
+
+    Raises governor.Busy when too many submissions are already waiting.
+    """
+    changed = []
+    for doc_type, doc_file in zip(DOC_TYPES, documents):
+        if doc_file is not None:
+            # re-uploading the same file skips OCR, embedding and re-validation
+            fp = change_tracking.fingerprint(doc_file.getvalue())
+            if not change_tracking.document_unchanged(email, doc_type, fp, DATA_DB_PATH):
+                changed.append((doc_type, doc_file, fp))
+    if not changed:
+        return
+
+    with GOVERNOR.slot(on_wait=on_wait):
+        for doc_type, doc_file, fp in changed:
+            images = rasterize_pdf(doc_file)
+            text = extract_text_from_images(images)
+            with metrics.timed("admission_chroma_upsert_seconds", "Chroma upsert latency (includes embedding)"):
+                get_collection().upsert(
+                    documents=[text],
+                    metadatas=[{"email": email, "document_type": doc_type}],
+                    ids=[f"{email}_{doc_type}"]
+                )
+            # flags copies of this document uploaded under other emails
+            with metrics.timed("admission_duplicate_check_seconds", "Duplicate document lookup latency"):
+                duplicate_index.register_document(email, doc_type, images, text, DATA_DB_PATH)
+            # an unreadable scan is not remembered, so a retry with the same file is OCRed again
+            change_tracking.record_document(email, doc_type, fp if text.strip() else None, DATA_DB_PATH)
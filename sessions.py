@@ -0,0 +1,206 @@
+import argparse
+import base64
+import http.cookies
+import hashlib
+import hmac
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from config import DB_PATH, SESSION_SECRET, SESSION_HOURS
+import metrics
+
+# -------------------------
+# Signed login sessions
+# -------------------------
+# A token is "<session id>.<expiry>.<signature>" with an HMAC-SHA256
+# signature, so forged, tampered or expired tokens are turned away without
+# touching the database. A valid token is looked up once in Sessions and
+# then answered from an in-memory cache shared by every Streamlit session of
+# the process. Revoking marks the row and drops the cache entry; cached
+# entries are re-read after CACHE_SECONDS so a revocation made by another
+# process still takes effect.
+
+CACHE_SECONDS = 60
+CACHE_SIZE = 10000
+
+_lock = threading.Lock()
+_cache = OrderedDict()  # session id -> (email, checked_at)
+_secrets = {}  # db path -> signing key
+
+
+def init_sessions(db_path=DB_PATH):
+    """Sessions table and the generated signing key"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Sessions (
+        Session_ID TEXT PRIMARY KEY,
+        Email TEXT NOT NULL,
+        Created_At TIMESTAMP NOT NULL,
+        Expires_At INTEGER NOT NULL,
+        Revoked BOOLEAN NOT NULL DEFAULT FALSE
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_email ON Sessions (Email)")
+    # used only when SESSION_SECRET is not set
+    cursor.execute("CREATE TABLE IF NOT EXISTS Session_Key (Id INTEGER PRIMARY KEY CHECK (Id = 1), Secret TEXT NOT NULL)")
+    cursor.execute("INSERT OR IGNORE INTO Session_Key (Id, Secret) VALUES (1, ?)", (secrets.token_hex(32),))
+    conn.commit()
+    conn.close()
+
+
+def purge_expired(db_path=DB_PATH):
+    """Delete expired sessions (they are already refused); returns how many"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    purged = conn.execute("DELETE FROM Sessions WHERE Expires_At < ?", (int(time.time()),)).rowcount
+    conn.commit()
+    conn.close()
+    return purged
+
+
+def _secret(db_path):
+    if SESSION_SECRET:
+        return SESSION_SECRET.encode()
+    if db_path not in _secrets:
+        conn = sqlite3.connect(db_path, timeout=30)
+        _secrets[db_path] = conn.execute("SELECT Secret FROM Session_Key WHERE Id = 1").fetchone()[0].encode()
+        conn.close()
+    return _secrets[db_path]
+
+
+def _sign(db_path, payload):
+    digest = hmac.new(_secret(db_path), payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def _remember(session_id, email):
+    with _lock:
+        _cache[session_id] = (email, time.monotonic())
+        _cache.move_to_end(session_id)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _forget(session_ids):
+    with _lock:
+        for session_id in session_ids:
+            _cache.pop(session_id, None)
+
+
+def _checked(result):
+    metrics.counter("admission_session_checks_total", "Session token checks by outcome").inc(result=result)
+
+
+# -------------------------
+# Tokens
+# -------------------------
+def create_session(email, hours=SESSION_HOURS, db_path=DB_PATH):
+    """New session for a verified login; returns its signed token"""
+    session_id = secrets.token_urlsafe(16)
+    expires = int(time.time() + hours * 3600)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("INSERT INTO Sessions (Session_ID, Email, Created_At, Expires_At) VALUES (?, ?, ?, ?)",
+                 (session_id, email, datetime.now(), expires))
+    conn.commit()
+    conn.close()
+    _remember(session_id, email)
+    return f"{session_id}.{expires}.{_sign(db_path, f'{session_id}.{expires}')}"
+
+
+def _parse(token, db_path):
+    """(session id, expiry) of a well-formed, correctly signed token, else None"""
+    try:
+        session_id, expires, signature = token.split(".")
+        expires = int(expires)
+    except (AttributeError, ValueError):
+        return None
+    if not hmac.compare_digest(signature.encode(), _sign(db_path, f"{session_id}.{expires}").encode()):
+        return None
+    return session_id, expires
+
+
+def verify_session(token, db_path=DB_PATH):
+    """Email of a valid, unexpired, unrevoked session token, else None"""
+    parsed = _parse(token, db_path)
+    if parsed is None or parsed[1] < time.time():
+        _checked("rejected")
+        return None
+    session_id, expires = parsed
+
+    with _lock:
+        entry = _cache.get(session_id)
+    if entry and time.monotonic() - entry[1] < CACHE_SECONDS:
+        _checked("cache")
+        return entry[0]
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    row = conn.execute("SELECT Email FROM Sessions WHERE Session_ID = ? AND Expires_At = ? AND NOT Revoked",
+                       (session_id, expires)).fetchone()
+    conn.close()
+    if row is None:
+        _forget([session_id])
+        _checked("rejected")
+        return None
+    _remember(session_id, row[0])
+    _checked("database")
+    return row[0]
+
+
+def revoke_session(token, db_path=DB_PATH):
+    parsed = _parse(token, db_path)
+    if parsed is None:
+        return False
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("UPDATE Sessions SET Revoked = TRUE WHERE Session_ID = ?", (parsed[0],))
+    conn.commit()
+    conn.close()
+    _forget([parsed[0]])
+    return True
+
+
+def revoke_user(email, db_path=DB_PATH):
+    """Log a user out everywhere (e.g. after a password reset); returns the number of sessions revoked"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    session_ids = [row[0] for row in conn.execute(
+        "SELECT Session_ID FROM Sessions WHERE Email = ? AND NOT Revoked", (email,))]
+    conn.execute("UPDATE Sessions SET Revoked = TRUE WHERE Email = ?", (email,))
+    conn.commit()
+    conn.close()
+    _forget(session_ids)
+    return len(session_ids)
+
+
+# -------------------------
+# Browser cookie
+# -------------------------
+# The portal keeps the token in a cookie rather than the URL, where it would
+# end up in browser history, proxy logs and shared links.
+COOKIE_NAME = "admission_session"
+
+
+def cookie_token(cookie_header):
+    """Session token from a request's Cookie header, else None"""
+    try:
+        morsel = http.cookies.SimpleCookie(cookie_header or "").get(COOKIE_NAME)
+    except http.cookies.CookieError:
+        return None
+    return morsel.value if morsel and morsel.value else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Portal login sessions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    revoke = sub.add_parser("revoke", help="log the given students out everywhere")
+    revoke.add_argument("emails", nargs="+")
+    sub.add_parser("purge", help="delete expired sessions")
+    args = parser.parse_args()
+
+    if args.command == "revoke":
+        for email in args.emails:
+            print(f"🔒 {email}: {revoke_user(email)} session(s) revoked")
+    elif args.command == "purge":
+        print(f"🧹 {purge_expired()} expired session(s) deleted")
@@ -0,0 +1,294 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+
+from config import DB_PATH, VECTOR_DB_PATH, SNAPSHOT_DIR
+
+# -------------------------
+# Online snapshots of admissions.db and vector_db
+# -------------------------
+# SQLite files are copied with the online backup API a few pages at a
+# time, so the portal and the pipeline keep writing while a snapshot runs.
+# Every file is then split into fixed 1 MiB chunks stored by content hash:
+# a snapshot only adds the chunks that changed since earlier snapshots,
+# and a restore is a straight sequential write of the chunks back out.
+#
+#   python snapshot.py create
+#   python snapshot.py list
+#   python snapshot.py restore <snapshot_id>     # stop the portal first
+#   python snapshot.py prune --keep 7
+
+CHUNK_SIZE = 1 << 20
+CHROMA_SQLITE = "chroma.sqlite3"
+SQLITE_SIDE_FILES = ("-wal", "-shm", "-journal")
+
+
+class BackupRestarted(Exception):
+    pass
+
+
+def backup_sqlite(src_path, dest_path, pages=1024, sleep=0.005, max_restarts=10):
+    """Consistent copy of a live SQLite file, `pages` pages per step.
+
+    Writers commit between steps. A commit from another connection makes
+    SQLite restart the copy; if that keeps happening the rest is copied in a
+    single step, which only holds a read lock for the time of one file copy.
+    """
+    src = sqlite3.connect(src_path, timeout=30)
+    dest = sqlite3.connect(dest_path)
+    state = {"remaining": None, "restarts": 0}
+
+    def progress(status, remaining, total):
+        if state["remaining"] is not None and remaining >= state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > max_restarts:
+                raise BackupRestarted()
+        state["remaining"] = remaining
+
+    try:
+        src.backup(dest, pages=pages, progress=progress, sleep=sleep)
+    except BackupRestarted:
+        src.backup(dest, pages=-1)
+    finally:
+        dest.close()
+        src.close()
+    return state["restarts"]
+
+
+def _segment_state(vector_path):
+    """{relative path: (mtime, size)} of every vector_db file except chroma.sqlite3 and its side files"""
+    state = {}
+    for root, _, names in os.walk(vector_path):
+        for name in names:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, vector_path)
+            if rel.startswith(CHROMA_SQLITE):
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            state[rel] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+def copy_segments(vector_path, dest, attempts=5):
+    """Copy Chroma's HNSW segment files as one consistent set.
+
+    The files of a segment are rewritten together on persist, so a copy only
+    counts if no file in the directory was added, removed or modified from
+    start to end; otherwise the whole set is copied again. Returns the
+    copied relative paths.
+    """
+    for _ in range(attempts):
+        shutil.rmtree(dest, ignore_errors=True)
+        before = _segment_state(vector_path)
+        try:
+            for rel in sorted(before):
+                os.makedirs(os.path.dirname(os.path.join(dest, rel)), exist_ok=True)
+                shutil.copyfile(os.path.join(vector_path, rel), os.path.join(dest, rel))
+        except FileNotFoundError:
+            pass  # removed mid-copy: the state check below fails
+        else:
+            if _segment_state(vector_path) == before:
+                return sorted(before)
+        time.sleep(0.2)
+    raise RuntimeError(f"{vector_path} kept changing while being copied")
+
+
+# -------------------------
+# Chunk store
+# -------------------------
+def _object_path(store, digest):
+    return os.path.join(store, "objects", digest[:2], digest)
+
+
+def store_file(path, store, stats):
+    """Chunk a file into the store; returns its manifest entry"""
+    chunks = []
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(CHUNK_SIZE)
+            if not data:
+                break
+            digest = hashlib.sha256(data).hexdigest()
+            target = _object_path(store, digest)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target + ".tmp", "wb") as out:
+                    out.write(data)
+                os.replace(target + ".tmp", target)
+                stats["new_bytes"] += len(data)
+            stats["total_bytes"] += len(data)
+            chunks.append(digest)
+    return {"size": os.path.getsize(path), "chunks": chunks}
+
+
+def write_file(entry, store, dest_path):
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    with open(dest_path, "wb") as out:
+        for digest in entry["chunks"]:
+            with open(_object_path(store, digest), "rb") as f:
+                out.write(f.read())
+
+
+def _manifest_path(store, snapshot_id):
+    return os.path.join(store, "manifests", f"{snapshot_id}.json")
+
+
+def list_snapshots(store=SNAPSHOT_DIR):
+    folder = os.path.join(store, "manifests")
+    if not os.path.isdir(folder):
+        return []
+    manifests = []
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".json"):
+            with open(os.path.join(folder, name)) as f:
+                manifests.append(json.load(f))
+    return manifests
+
+
+# -------------------------
+# Snapshot / restore
+# -------------------------
+def create_snapshot(db_path=DB_PATH, vector_path=VECTOR_DB_PATH, store=SNAPSHOT_DIR, pages=1024, sleep=0.005):
+    """Snapshot both stores; returns the manifest"""
+    start = time.time()
+    while True:
+        # microseconds keep ids unique and sortable; the staging directory
+        # claims the id against a snapshot started at the same moment
+        snapshot_id = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        staging = os.path.join(store, "staging", snapshot_id)
+        try:
+            os.makedirs(staging)
+            break
+        except FileExistsError:
+            continue
+    stats = {"new_bytes": 0, "total_bytes": 0}
+    files = {}
+    try:
+        staged = os.path.join(staging, "admissions.db")
+        restarts = backup_sqlite(db_path, staged, pages, sleep)
+        files["admissions.db"] = store_file(staged, store, stats)
+        os.remove(staged)
+
+        if os.path.isdir(vector_path):
+            # HNSW segment files first, chroma.sqlite3 second: the segments then
+            # never run ahead of the copied embeddings queue, and Chroma replays
+            # whatever the copied index is missing when the snapshot is opened
+            segments = os.path.join(staging, "segments")
+            for rel in copy_segments(vector_path, segments):
+                files[f"vector_db/{rel}"] = store_file(os.path.join(segments, rel), store, stats)
+            shutil.rmtree(segments, ignore_errors=True)
+            chroma_db = os.path.join(vector_path, CHROMA_SQLITE)
+            if os.path.exists(chroma_db):
+                staged = os.path.join(staging, CHROMA_SQLITE)
+                restarts += backup_sqlite(chroma_db, staged, pages, sleep)
+                files[f"vector_db/{CHROMA_SQLITE}"] = store_file(staged, store, stats)
+                os.remove(staged)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    manifest = {
+        "id": snapshot_id,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "files": files,
+        "total_bytes": stats["total_bytes"],
+        "new_bytes": stats["new_bytes"],
+        "backup_restarts": restarts,
+        "seconds": round(time.time() - start, 2),
+    }
+    os.makedirs(os.path.join(store, "manifests"), exist_ok=True)
+    with open(_manifest_path(store, snapshot_id) + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(_manifest_path(store, snapshot_id) + ".tmp", _manifest_path(store, snapshot_id))
+    return manifest
+
+
+def restore_snapshot(snapshot_id, db_path=DB_PATH, vector_path=VECTOR_DB_PATH, store=SNAPSHOT_DIR):
+    """Put a snapshot back in place. The replaced files are kept as *.before-restore."""
+    with open(_manifest_path(store, snapshot_id)) as f:
+        manifest = json.load(f)
+
+    # write everything next to the targets first, then swap with renames
+    db_staged = db_path + ".restoring"
+    vector_staged = vector_path.rstrip("/") + ".restoring"
+    shutil.rmtree(vector_staged, ignore_errors=True)
+    write_file(manifest["files"]["admissions.db"], store, db_staged)
+    for name, entry in manifest["files"].items():
+        if name.startswith("vector_db/"):
+            write_file(entry, store, os.path.join(vector_staged, name[len("vector_db/"):]))
+
+    if os.path.exists(db_path):
+        os.replace(db_path, db_path + ".before-restore")
+    for suffix in SQLITE_SIDE_FILES:
+        # a leftover WAL would be replayed into the restored file
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.replace(db_staged, db_path)
+
+    if os.path.isdir(vector_staged):
+        previous = vector_path.rstrip("/") + ".before-restore"
+        shutil.rmtree(previous, ignore_errors=True)
+        if os.path.isdir(vector_path):
+            os.rename(vector_path, previous)
+        os.rename(vector_staged, vector_path)
+    return manifest
+
+
+def prune_snapshots(keep, store=SNAPSHOT_DIR):
+    """Drop all but the newest `keep` snapshots and the chunks only they used"""
+    manifests = list_snapshots(store)
+    dropped = manifests[:-keep] if keep else manifests
+    for manifest in dropped:
+        os.remove(_manifest_path(store, manifest["id"]))
+    live = {digest for manifest in manifests[len(dropped):]
+            for entry in manifest["files"].values() for digest in entry["chunks"]}
+    freed = 0
+    objects = os.path.join(store, "objects")
+    for root, _, names in os.walk(objects):
+        for name in names:
+            if name not in live:
+                path = os.path.join(root, name)
+                freed += os.path.getsize(path)
+                os.remove(path)
+    return len(dropped), freed
+
+
+def _mb(n):
+    return f"{n / (1 << 20):.1f} MB"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Online snapshots of admissions.db and vector_db")
+    sub = parser.add_subparsers(dest="command", required=True)
+    create = sub.add_parser("create")
+    create.add_argument("--pages", type=int, default=1024, help="pages copied per backup step")
+    create.add_argument("--sleep", type=float, default=0.005, help="pause between steps (s)")
+    sub.add_parser("list")
+    restore = sub.add_parser("restore")
+    restore.add_argument("snapshot_id")
+    prune = sub.add_parser("prune")
+    prune.add_argument("--keep", type=int, required=True)
+    args = parser.parse_args()
+
+    if args.command == "create":
+        m = create_snapshot(pages=args.pages, sleep=args.sleep)
+        print(f"✅ Snapshot {m['id']}: {_mb(m['total_bytes'])} in {len(m['files'])} files, "
+              f"{_mb(m['new_bytes'])} new, {m['seconds']}s")
+    elif args.command == "list":
+        for m in list_snapshots():
+            print(f"{m['id']}  {_mb(m['total_bytes']):>10}  (+{_mb(m['new_bytes'])})  {len(m['files'])} files")
+    elif args.command == "restore":
+        start = time.time()
+        m = restore_snapshot(args.snapshot_id)
+        print(f"✅ Restored {m['id']} ({_mb(m['total_bytes'])}) in {time.time() - start:.1f}s; "
+              f"previous data kept as *.before-restore")
+    elif args.command == "prune":
+        dropped, freed = prune_snapshots(args.keep)
+        print(f"🧹 Removed {dropped} snapshot(s), freed {_mb(freed)}")
@@ -0,0 +1,34 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Fresh admissions database with the full schema"""
+    path = str(tmp_path / "admissions.db")
+    main.init_sql_db(path)
+    return path
+
+
+def add_applicant(db_path, email, rank, valid=True, stream="CSE"):
+    """Applicant with a validated (or invalid) application and an empty result row"""
+    conn = sqlite3.connect(db_path)
+    number = abs(hash(email)) % 10**10
+    conn.execute("INSERT INTO Login_Credentials VALUES (?, 'x')", (email,))
+    conn.execute("INSERT INTO Primary_Data (Email, Name, Mobile_Number) VALUES (?, ?, ?)",
+                 (email, email.split("@")[0], str(number)))
+    conn.execute("""
+        INSERT INTO Application_Data (Email, Aadhar_Number, DOB, JEE_Year, JEE_Rank, Stream_Applied,
+                                      application_validation_done, application_valid)
+        VALUES (?, ?, '2006-01-01', 2025, ?, ?, TRUE, ?)
+    """, (email, str(number), rank, stream, valid))
+    conn.execute("INSERT INTO Admission_Results (Email) VALUES (?)", (email,))
+    conn.commit()
+    conn.close()
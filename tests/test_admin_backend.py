@@ -0,0 +1,50 @@
+import sqlite3
+
+import admin_backend
+from conftest import add_applicant
+
+
+def _all_pages(db_path, **filters):
+    emails, after = [], None
+    while True:
+        rows, after = admin_backend.fetch_applicants(order="jee_rank", after=after, limit=2,
+                                                     db_path=db_path, **filters)
+        emails += [row["Email"] for row in rows]
+        if after is None:
+            return emails
+
+
+def test_rank_pages_include_unranked_applicants(db_path):
+    for i in range(8):
+        add_applicant(db_path, f"s{i}@x.com", 100 - i if i % 2 else None)
+
+    emails = _all_pages(db_path)
+    assert emails == ["s7@x.com", "s5@x.com", "s3@x.com", "s1@x.com",
+                      "s0@x.com", "s2@x.com", "s4@x.com", "s6@x.com"]
+    assert _all_pages(db_path, stream="CSE") == emails
+
+
+def test_rank_pages_use_index(db_path):
+    conn = sqlite3.connect(db_path)
+    plan = " ".join(row[3] for row in conn.execute(f"""
+        EXPLAIN QUERY PLAN SELECT a.Email FROM Application_Data a
+        WHERE ({admin_backend.PAGE_ORDERS['jee_rank'][0]}, a.Email) > (?, ?)
+        ORDER BY {', '.join(admin_backend.PAGE_ORDERS['jee_rank'])} LIMIT 3
+    """, (5, "")))
+    conn.close()
+    assert "idx_application_ranked" in plan and "TEMP B-TREE" not in plan
+
+
+def test_duplicate_flags_listed_for_review(db_path):
+    import duplicate_index
+
+    add_applicant(db_path, "a@x.com", 10)
+    add_applicant(db_path, "b@x.com", 20)
+    text = "roll no 12345678 certify that a student scored 095 in physics 091 in maths"
+    duplicate_index.register_document("a@x.com", "jee_rank_card", [], text, db_path)
+    duplicate_index.register_document("b@x.com", "jee_rank_card", [], text, db_path)
+
+    total, rows = admin_backend.fetch_duplicate_flags(db_path=db_path)
+    assert total == 1
+    assert rows[0]["Email"] == "b@x.com" and rows[0]["Matches"] == "a@x.com"
+    assert rows[0]["Name"] == "b" and rows[0]["Text similarity"] == 1.0
@@ -0,0 +1,72 @@
+import sqlite3
+
+import allocation
+from conftest import add_applicant
+
+
+def _seats(db_path, **streams):
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO Admission_Seats VALUES (?, ?, ?)",
+                     [(stream, total, total) for stream, total in streams.items()])
+    conn.commit()
+    conn.close()
+
+
+def test_round_releases_seat_of_invalidated_applicant(db_path):
+    _seats(db_path, CSE=1, ECE=1)
+    add_applicant(db_path, "a@x.com", 10)
+    add_applicant(db_path, "b@x.com", 20)
+    allocation.set_preferences("a@x.com", ["CSE", "ECE"], db_path)
+    allocation.set_preferences("b@x.com", ["CSE", "ECE"], db_path)
+    allocation.run_round(db_path)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT Stream FROM Seat_Allocations WHERE Email='a@x.com'").fetchone() == ("CSE",)
+    conn.execute("UPDATE Admission_Results SET acceptance_status_email_sent=TRUE")
+    conn.execute("UPDATE Application_Data SET application_valid=FALSE WHERE Email='a@x.com'")
+    conn.commit()
+    assert allocation.round_pending(db_path)
+
+    summary = allocation.run_round(db_path)
+    assert summary["released"] == 1
+    assert conn.execute("SELECT Stream, Preference_Rank FROM Seat_Allocations WHERE Email='a@x.com'"
+                        ).fetchone() == (None, None)
+    assert conn.execute("""
+        SELECT acceptance_status, Allocated_Stream, acceptance_status_email_sent
+        FROM Admission_Results WHERE Email='a@x.com'
+    """).fetchone() == (0, None, 0)
+    # the freed CSE seat went to the next applicant
+    assert conn.execute("SELECT Allocated_Stream FROM Admission_Results WHERE Email='b@x.com'").fetchone() == ("CSE",)
+    assert dict(conn.execute("SELECT Stream, Available_Seats FROM Admission_Seats")) == {"CSE": 0, "ECE": 1}
+    conn.close()
+
+
+def test_withdrawal_frees_seat(db_path):
+    _seats(db_path, CSE=1)
+    add_applicant(db_path, "a@x.com", 10)
+    allocation.set_preferences("a@x.com", ["CSE"], db_path)
+    allocation.run_round(db_path)
+    allocation.set_seat_choice("a@x.com", allocation.WITHDRAWN, db_path)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT Available_Seats FROM Admission_Seats").fetchone() == (1,)
+    assert conn.execute("SELECT Stream, Status FROM Seat_Allocations").fetchone() == (None, "withdrawn")
+    assert conn.execute("SELECT acceptance_status, Allocated_Stream FROM Admission_Results").fetchone() == (0, None)
+    conn.close()
+
+
+def test_applicant_without_rank_gets_a_result_and_round_closes(db_path):
+    _seats(db_path, CSE=1)
+    add_applicant(db_path, "a@x.com", 0)
+    add_applicant(db_path, "b@x.com", 10)
+    assert allocation.round_pending(db_path)
+
+    summary = allocation.run_round(db_path)
+    assert summary["excluded"] == 1
+    assert not allocation.round_pending(db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("""
+        SELECT shortlisting_done, acceptance_status, Allocated_Stream FROM Admission_Results WHERE Email='a@x.com'
+    """).fetchone() == (1, 0, None)
+    assert conn.execute("SELECT Allocated_Stream FROM Admission_Results WHERE Email='b@x.com'").fetchone() == ("CSE",)
+    conn.close()
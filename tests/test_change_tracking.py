@@ -0,0 +1,13 @@
+import change_tracking
+from conftest import add_applicant
+
+
+def test_unreadable_document_is_not_remembered(db_path):
+    add_applicant(db_path, "a@x.com", 10)
+    fp = change_tracking.fingerprint(b"scan")
+    change_tracking.record_document("a@x.com", "aadhar_card", fp, db_path)
+    assert change_tracking.document_unchanged("a@x.com", "aadhar_card", fp, db_path)
+
+    # the same file again, this time OCR came back empty
+    change_tracking.record_document("a@x.com", "aadhar_card", None, db_path)
+    assert not change_tracking.document_unchanged("a@x.com", "aadhar_card", fp, db_path)
@@ -0,0 +1,59 @@
+import sqlite3
+
+import cohorts
+import main
+from conftest import add_applicant
+
+
+def test_split_keeps_every_account_in_active_cohort(tmp_path):
+    legacy = str(tmp_path / "admissions.db")
+    main.init_sql_db(legacy)
+    add_applicant(legacy, "old@x.com", 50)
+    add_applicant(legacy, "new@x.com", 60)
+    conn = sqlite3.connect(legacy)
+    conn.execute("UPDATE Application_Data SET JEE_Year = 2024 WHERE Email = 'old@x.com'")
+    conn.execute("INSERT INTO Login_Credentials VALUES ('fresh@x.com', 'x')")
+    conn.commit()
+    conn.close()
+
+    cohort_dir = str(tmp_path / "cohorts")
+    cohorts.split_database(legacy, "2025", cohort_dir, str(tmp_path / "no_vectors"))
+
+    def emails(cohort, table):
+        conn = sqlite3.connect(cohorts.cohort_db_path(cohort, cohort_dir))
+        rows = sorted(row[0] for row in conn.execute(f"SELECT Email FROM {table}"))
+        conn.close()
+        return rows
+
+    assert emails("2025", "Login_Credentials") == ["fresh@x.com", "new@x.com", "old@x.com"]
+    assert emails("2025", "Primary_Data") == ["new@x.com", "old@x.com"]
+    assert emails("2025", "Application_Data") == ["new@x.com"]
+    assert emails("2025", "Admission_Results") == ["new@x.com"]
+    assert emails("2024", "Login_Credentials") == ["old@x.com"]
+    assert emails("2024", "Application_Data") == ["old@x.com"]
+
+
+def test_account_from_earlier_cohort_can_apply_in_active_cohort(tmp_path, monkeypatch):
+    import portal_backend
+
+    legacy = str(tmp_path / "admissions.db")
+    main.init_sql_db(legacy)
+    add_applicant(legacy, "old@x.com", 50)
+    conn = sqlite3.connect(legacy)
+    conn.execute("UPDATE Application_Data SET JEE_Year = 2024")
+    conn.commit()
+    conn.close()
+    cohort_dir = str(tmp_path / "cohorts")
+    cohorts.split_database(legacy, "2025", cohort_dir, str(tmp_path / "no_vectors"))
+
+    active = cohorts.cohort_db_path("2025", cohort_dir)
+    monkeypatch.setattr(portal_backend, "DATA_DB_PATH", active)
+    portal_backend.upsert_student_data(
+        "old@x.com", "Old Student", "9000000001", "123412341234", "2006-01-01", 2021, 88.0,
+        2023, 80.0, 85.0, 82.0, 2025, 1500, "CSE")
+
+    data = portal_backend.fetch_student_data("old@x.com")
+    assert data["Name"] == "Old Student" and data["JEEYear"] == 2025 and data["JEERank"] == 1500
+    conn = sqlite3.connect(active)
+    assert conn.execute("SELECT COUNT(*) FROM Admission_Results WHERE Email = 'old@x.com'").fetchone() == (1,)
+    conn.close()
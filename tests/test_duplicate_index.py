@@ -0,0 +1,142 @@
+import random
+
+from PIL import Image
+
+import duplicate_index as di
+
+DOC = "class_12_marksheet"
+NAMES = ["aarav", "diya", "ishaan", "kavya", "arjun", "myra", "vihaan", "riya", "sai", "anika"]
+SURNAMES = ["sharma", "verma", "iyer", "nair", "patel", "reddy", "das", "joshi"]
+
+
+def marksheet(rng):
+    """Board marksheet text: a fixed template around one student's details"""
+    lines = ["central board of secondary education senior school certificate examination",
+             f"this is to certify that {rng.choice(NAMES)} {rng.choice(SURNAMES)}",
+             f"roll no {rng.randint(10**7, 10**8)} mother s name {rng.choice(NAMES)} {rng.choice(SURNAMES)}",
+             f"date of birth {rng.randint(1, 28)} {rng.randint(1, 12)} 2006",
+             "has achieved scholastic achievements as under sub code subject theory practical total grade"]
+    for code, subject in enumerate(["english", "physics", "chemistry", "mathematics", "computer science"]):
+        theory, practical = rng.randint(40, 70), rng.randint(15, 30)
+        lines.append(f"{41 + code} {subject} {theory:03d} {practical:03d} {theory + practical:03d} "
+                     f"{rng.choice(['a1', 'a2', 'b1', 'b2'])}")
+    lines.append("result pass controller of examinations this is a computer generated document")
+    return " ".join(lines)
+
+
+def ocr_noise(text, rng, rate=0.02):
+    return " ".join(word if rng.random() > rate else word[:-1] for word in text.split())
+
+
+def filled_index(texts):
+    index = di.DuplicateIndex()
+    index.add_many([(f"s{i}@x.com", DOC, [], di.shingle_hashes(text)) for i, text in enumerate(texts)])
+    return index
+
+
+def test_template_text_alone_is_not_a_duplicate():
+    rng = random.Random(7)
+    index = filled_index([marksheet(rng) for _ in range(300)])
+    for i in range(50):
+        assert index.find_matches(f"new{i}@x.com", DOC, [], di.shingle_hashes(marksheet(rng))) == []
+
+
+def test_ocr_copy_of_a_marksheet_is_found():
+    rng = random.Random(8)
+    texts = [marksheet(rng) for _ in range(300)]
+    index = filled_index(texts)
+    for i in rng.sample(range(len(texts)), 30):
+        matches = index.find_matches("copy@x.com", DOC, [], di.shingle_hashes(ocr_noise(texts[i], rng)))
+        assert [m[0] for m in matches] == [f"s{i}@x.com"]
+        assert matches[0][1] >= di.TEXT_SIMILARITY_THRESHOLD
+
+
+def test_same_applicant_is_never_its_own_duplicate():
+    rng = random.Random(9)
+    texts = [marksheet(rng) for _ in range(30)]
+    index = filled_index(texts)
+    assert index.find_matches("s3@x.com", DOC, [], di.shingle_hashes(texts[3])) == []
+
+
+def test_documents_without_text_do_not_collide():
+    index = di.DuplicateIndex()
+    for i in range(5):
+        index.add(f"s{i}@x.com", DOC, [], di.shingle_hashes(""))
+    assert index.find_matches("new@x.com", DOC, [], []) == []
+
+
+def _register(db_path, email, text):
+    return di.register_document(email, DOC, [], text, db_path)
+
+
+def test_index_forgets_documents_deleted_elsewhere(db_path, monkeypatch):
+    monkeypatch.setattr(di, "_index", None)
+    rng = random.Random(10)
+    text = marksheet(rng)
+    _register(db_path, "a@x.com", text)
+    assert [m[0] for m in _register(db_path, "b@x.com", text)] == ["a@x.com"]
+    assert di.fetch_flags("b@x.com", db_path) == [(DOC, "a@x.com", 1.0, None)]
+
+    # e.g. `vector_maintenance.py delete` run from another process
+    di.forget_applicants(["a@x.com"], db_path)
+    assert di.fetch_flags("b@x.com", db_path) == []
+    assert [m[0] for m in _register(db_path, "c@x.com", text)] == ["b@x.com"]
+    assert len(di.get_index(db_path)) == 2
+
+
+def _flip(value, rng, bits):
+    for b in rng.sample(range(64), bits):
+        value ^= 1 << b
+    return value
+
+
+def test_page_hash_index_matches_a_full_scan():
+    rng = random.Random(11)
+    stored = {f"s{i}@x.com": rng.getrandbits(64) for i in range(2000)}
+    pages = di.PageHashIndex()
+    for owner, value in stored.items():
+        pages.add(value, owner)
+
+    for owner in rng.sample(sorted(stored), 100):
+        query = _flip(stored[owner], rng, rng.randint(0, 7))
+        expected = {o: di.hamming(query, v) for o, v in stored.items() if di.hamming(query, v) <= 7}
+        assert pages.search(query, 7) == expected
+        assert owner in expected
+
+    pages.remove(stored["s0@x.com"], "s0@x.com")
+    assert "s0@x.com" not in pages.search(stored["s0@x.com"], 0)
+
+
+def _page(seed):
+    """A noisy scanned page, different for every seed"""
+    rng = random.Random(seed)
+    image = Image.new("L", (90, 80))
+    image.putdata([rng.randrange(256) for _ in range(90 * 80)])
+    return image.resize((900, 800))
+
+
+def test_same_scanned_page_is_a_duplicate_without_text():
+    index = di.DuplicateIndex()
+    for i in range(20):
+        index.add(f"s{i}@x.com", DOC, [di.page_hash(_page(i))], [])
+    rescan = _page(4).rotate(0.3, fillcolor=128)
+    matches = index.find_matches("new@x.com", DOC, [di.page_hash(rescan)], [])
+    assert [(m[0], m[1]) for m in matches] == [("s4@x.com", None)]
+    assert matches[0][2] <= di.IMAGE_ONLY_DISTANCE
+
+
+def test_flags_are_replaced_when_a_document_is_uploaded_again(db_path, monkeypatch):
+    monkeypatch.setattr(di, "_index", None)
+    rng = random.Random(12)
+    original, other = marksheet(rng), marksheet(rng)
+    _register(db_path, "a@x.com", original)
+    _register(db_path, "b@x.com", original)
+    assert [flag[1] for flag in di.fetch_flags("b@x.com", db_path)] == ["a@x.com"]
+
+    # a fresh process loads the same signatures and flags from the database
+    monkeypatch.setattr(di, "_index", None)
+    assert len(di.get_index(db_path)) == 2
+    assert [flag[1] for flag in di.fetch_flags("b@x.com", db_path)] == ["a@x.com"]
+
+    _register(db_path, "b@x.com", other)
+    assert di.fetch_flags("b@x.com", db_path) == []
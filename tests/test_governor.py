@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+import governor
+
+POLL = 0.01
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(POLL)
+
+
+class Job(threading.Thread):
+    """Submission that holds its slot until released"""
+
+    def __init__(self, gov):
+        super().__init__(daemon=True)
+        self.gov = gov
+        self.positions = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.error = None
+
+    def run(self):
+        try:
+            with self.gov.slot(on_wait=lambda position, wait: self.positions.append(position), poll=POLL):
+                self.started.set()
+                self.release.wait(5)
+        except governor.Busy as e:
+            self.error = e
+
+    def finish(self):
+        self.release.set()
+        self.join(5)
+
+
+@pytest.fixture
+def free_memory(monkeypatch):
+    """Stubbed free-memory probe; set free_memory["mb"] to change it"""
+    probe = {"mb": 10_000}
+    monkeypatch.setattr(governor, "available_memory_mb", lambda: probe["mb"])
+    return probe
+
+
+def test_no_more_jobs_run_than_slots(free_memory):
+    gov = governor.Governor(slots=2, max_queue=10)
+    jobs = [Job(gov) for _ in range(5)]
+    for job in jobs:
+        job.start()
+    _wait_until(lambda: gov.running == 2 and len(gov.queue) == 3)
+    assert sum(job.started.is_set() for job in jobs) == 2
+
+    # release whichever jobs hold a slot, one at a time, until all have run
+    for _ in jobs:
+        _wait_until(lambda: any(job.started.is_set() and job.is_alive() for job in jobs))
+        assert gov.running <= 2
+        next(job for job in jobs if job.started.is_set() and job.is_alive()).finish()
+    assert all(job.started.is_set() for job in jobs)
+    assert gov.running == 0 and not gov.queue
+
+
+def test_waiting_jobs_see_their_place_in_line(free_memory):
+    gov = governor.Governor(slots=1, max_queue=10)
+    first, second, third = Job(gov), Job(gov), Job(gov)
+    first.start()
+    _wait_until(first.started.is_set)
+    second.start()
+    _wait_until(lambda: second.positions == [1])
+    third.start()
+    _wait_until(lambda: third.positions == [2])
+
+    first.finish()
+    _wait_until(second.started.is_set)
+    # the estimate may also change before the line moves up, repeating position 2
+    _wait_until(lambda: third.positions[-1] == 1)
+    assert set(third.positions) == {2, 1}
+    assert not third.started.is_set()
+    second.finish()
+    third.finish()
+    assert third.started.is_set()
+
+
+def test_full_queue_turns_submissions_away(free_memory):
+    gov = governor.Governor(slots=1, max_queue=1)
+    running, queued, rejected = Job(gov), Job(gov), Job(gov)
+    running.start()
+    _wait_until(running.started.is_set)
+    queued.start()
+    _wait_until(lambda: len(gov.queue) == 1)
+    rejected.start()
+    rejected.join(5)
+
+    assert isinstance(rejected.error, governor.Busy)
+    assert rejected.error.wait == gov.estimated_wait(1) > 0
+    running.finish()
+    queued.finish()
+    assert queued.started.is_set() and queued.error is None
+
+
+def test_low_memory_holds_back_a_free_slot(free_memory):
+    gov = governor.Governor(slots=3, max_queue=10, job_memory_mb=100, min_free_mb=100)
+    free_memory["mb"] = 150
+    first = Job(gov)
+    first.start()
+    _wait_until(first.started.is_set)  # the first job always runs, whatever the memory
+    second = Job(gov)
+    second.start()
+    _wait_until(lambda: second.positions == [1])
+    time.sleep(10 * POLL)
+    assert not second.started.is_set() and gov.running == 1
+
+    free_memory["mb"] = 200
+    _wait_until(second.started.is_set)
+    first.finish()
+    second.finish()
@@ -0,0 +1,15 @@
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+HEAVY = ["pytesseract", "pdf2image", "chromadb", "crewai", "googleapiclient", "google_auth_oauthlib"]
+
+
+def test_heavy_libraries_are_not_loaded_at_import(tmp_path):
+    # a fresh interpreter: this test process has imported chromadb already
+    code = (f"import sys; sys.path.insert(0, {str(REPO)!r}); import communicator, portal_backend; "
+            f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
@@ -0,0 +1,83 @@
+import threading
+import urllib.request
+
+import pytest
+
+import metrics
+
+
+def _series(name):
+    """{sample line name with labels: value} for one metric from the text exposition"""
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+            for line in metrics.render_prometheus().splitlines()
+            if line.startswith(name) and not line.startswith("#")}
+
+
+def test_counter_exposition_escapes_labels():
+    counter = metrics.counter("test_exposition_total", "Things counted")
+    counter.inc(op="a")
+    counter.inc(2, op='say "hi"\n')
+    text = metrics.render_prometheus()
+    assert "# HELP test_exposition_total Things counted\n# TYPE test_exposition_total counter\n" in text
+    assert _series("test_exposition_total") == {
+        'test_exposition_total{op="a"}': 1,
+        'test_exposition_total{op="say \\"hi\\"\\n"}': 2,
+    }
+
+
+def test_histogram_buckets_are_cumulative(monkeypatch):
+    histogram = metrics.Histogram("test_buckets_seconds", "", buckets=(0.1, 1, 10))
+    monkeypatch.setitem(metrics._metrics, histogram.name, histogram)
+    for value in (0.05, 0.1, 0.5, 3, 3, 50):
+        histogram.observe(value, stage="ocr")
+    assert _series("test_buckets_seconds") == {
+        'test_buckets_seconds_bucket{stage="ocr",le="0.1"}': 2,  # upper bounds are inclusive
+        'test_buckets_seconds_bucket{stage="ocr",le="1"}': 3,
+        'test_buckets_seconds_bucket{stage="ocr",le="10"}': 5,
+        'test_buckets_seconds_bucket{stage="ocr",le="+Inf"}': 6,
+        'test_buckets_seconds_sum{stage="ocr"}': 56.65,
+        'test_buckets_seconds_count{stage="ocr"}': 6,
+    }
+    assert histogram.quantile((("stage", "ocr"),), 0.5) == 1
+    assert histogram.quantile((("stage", "ocr"),), 0.95) == float("inf")
+
+
+def test_timed_as_decorator_and_context_manager():
+    @metrics.timed("test_timed_seconds", op="fn")
+    def work(fail=False):
+        if fail:
+            raise ValueError("boom")
+        return "done"
+
+    assert work() == "done"
+    with pytest.raises(ValueError):
+        work(fail=True)
+    with metrics.timed("test_timed_seconds", op="block"):
+        pass
+
+    counts = _series("test_timed_seconds_count")
+    assert counts == {'test_timed_seconds_count{op="block"}': 1, 'test_timed_seconds_count{op="fn"}': 2}
+    assert _series("test_timed_errors_total") == {'test_timed_errors_total{op="fn"}': 1}
+
+
+def test_timed_decorator_can_be_reentered():
+    @metrics.timed("test_recursive_seconds")
+    def countdown(n):
+        return 0 if n == 0 else countdown(n - 1) + 1
+
+    assert countdown(3) == 3
+    assert _series("test_recursive_seconds_count") == {"test_recursive_seconds_count": 4}
+
+
+def test_metrics_endpoint_serves_the_exposition():
+    server = metrics.ThreadingHTTPServer(("127.0.0.1", 0), metrics._Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        metrics.counter("test_endpoint_total").inc()
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "test_endpoint_total 1" in response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
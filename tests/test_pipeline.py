@@ -0,0 +1,30 @@
+import sqlite3
+
+import allocation
+import pipeline
+from conftest import add_applicant
+
+
+def test_ingest_of_edited_application_releases_seat(db_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "DB_PATH", db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO Admission_Seats VALUES ('CSE', 1, 1)")
+    conn.commit()
+    add_applicant(db_path, "a@x.com", 10)
+    allocation.set_preferences("a@x.com", ["CSE"], db_path)
+    allocation.run_round(db_path)
+    conn.execute("UPDATE Admission_Results SET acceptance_status_email_sent=TRUE")
+    conn.execute("UPDATE Application_Data SET application_edited=TRUE")
+    conn.commit()
+
+    assert pipeline.pending_ingest(None) == ["a@x.com"]
+    pipeline.run_ingest(["a@x.com"], None)
+    assert conn.execute("""
+        SELECT shortlisting_done, acceptance_status, acceptance_status_email_sent, Allocated_Stream
+        FROM Admission_Results
+    """).fetchone() == (0, 0, 0, None)
+    assert conn.execute("SELECT Stream FROM Seat_Allocations").fetchone() == (None,)
+    assert conn.execute("SELECT Available_Seats FROM Admission_Seats").fetchone() == (1,)
+    assert conn.execute("SELECT application_validation_done, application_edited FROM Application_Data"
+                        ).fetchone() == (0, 0)
+    conn.close()
@@ -0,0 +1,38 @@
+import sqlite3
+
+import chromadb
+
+import allocation
+import change_tracking
+import duplicate_index
+import main
+import sessions
+from conftest import add_applicant
+
+
+def test_reset_clears_every_applicant_table_and_the_vector_db(db_path, monkeypatch):
+    monkeypatch.setattr(duplicate_index, "_index", None)
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO Admission_Seats VALUES ('CSE', 2, 2)")
+    conn.commit()
+    collection = chromadb.EphemeralClient().get_or_create_collection("reset_docs")
+    for email in ("a@x.com", "b@x.com"):
+        add_applicant(db_path, email, 10)
+        allocation.set_preferences(email, ["CSE"], db_path)
+        change_tracking.record_document(email, "aadhar_card", "fp", db_path)
+        duplicate_index.register_document(email, "aadhar_card", [], "aadhaar 1234 5678 9012", db_path)
+        sessions.create_session(email, db_path=db_path)
+        collection.add(ids=[f"{email}_aadhar_card"], embeddings=[[1.0, 0.0]], metadatas=[{"email": email}])
+    conn.execute("INSERT INTO Validation_Checks VALUES ('a@x.com', 'Name', 'aadhar_card', TRUE, NULL)")
+    conn.commit()
+    allocation.run_round(db_path)
+    for table in main.RESET_TABLES:
+        assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone() != (0,), table
+
+    main.reset_test_data(db_path, collection)
+
+    for table in main.RESET_TABLES:
+        assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone() == (0,), table
+    assert conn.execute("SELECT Available_Seats FROM Admission_Seats").fetchone() == (2,)
+    assert collection.count() == 0
+    assert len(duplicate_index.get_index(db_path)) == 0
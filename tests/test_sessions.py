@@ -0,0 +1,26 @@
+import sqlite3
+import time
+
+import sessions
+
+
+def test_expired_sessions_are_purged_on_demand(db_path):
+    token = sessions.create_session("a@x.com", db_path=db_path)
+    old = sessions.create_session("b@x.com", hours=-1, db_path=db_path)
+    assert sessions.verify_session(old, db_path) is None
+
+    sessions.init_sessions(db_path)  # setup alone keeps every row
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM Sessions").fetchone() == (2,)
+    assert sessions.purge_expired(db_path) == 1
+    assert conn.execute("SELECT Email FROM Sessions WHERE Expires_At > ?", (int(time.time()),)).fetchall() == [("a@x.com",)]
+    conn.close()
+    assert sessions.verify_session(token, db_path) == "a@x.com"
+
+
+def test_token_is_read_from_the_session_cookie(db_path):
+    token = sessions.create_session("a@x.com", db_path=db_path)
+    header = f"theme=dark; {sessions.COOKIE_NAME}={token}; _xsrf=2|abc"
+    assert sessions.verify_session(sessions.cookie_token(header), db_path) == "a@x.com"
+    assert sessions.cookie_token(f"{sessions.COOKIE_NAME}=") is None
+    assert sessions.cookie_token(None) is None
@@ -0,0 +1,65 @@
+import os
+import sqlite3
+
+import pytest
+
+import snapshot
+
+
+def _stores(tmp_path):
+    db_path = str(tmp_path / "admissions.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE t (x)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    conn.close()
+    vector_path = tmp_path / "vector_db"
+    (vector_path / "segment-1").mkdir(parents=True)
+    (vector_path / "segment-1" / "data_level0.bin").write_bytes(b"a" * 100)
+    (vector_path / "segment-1" / "header.bin").write_bytes(b"h")
+    return db_path, str(vector_path), str(tmp_path / "snapshots")
+
+
+def test_snapshots_in_the_same_second_get_their_own_ids(tmp_path):
+    db_path, vector_path, store = _stores(tmp_path)
+    ids = [snapshot.create_snapshot(db_path, vector_path, store)["id"] for _ in range(3)]
+    assert len(set(ids)) == 3
+    assert [m["id"] for m in snapshot.list_snapshots(store)] == ids
+    assert set(snapshot.list_snapshots(store)[0]["files"]) == {
+        "admissions.db", "vector_db/segment-1/data_level0.bin", "vector_db/segment-1/header.bin"}
+
+
+def test_segments_copied_again_when_directory_changes(tmp_path, monkeypatch):
+    _, vector_path, _ = _stores(tmp_path)
+    copyfile = snapshot.shutil.copyfile
+    calls = []
+
+    def copy_and_persist(src, dest):
+        copyfile(src, dest)
+        calls.append(src)
+        if len(calls) == 1:
+            # Chroma persisting the segment halfway through the first pass
+            with open(os.path.join(vector_path, "segment-1", "header.bin"), "ab") as f:
+                f.write(b"!")
+
+    monkeypatch.setattr(snapshot.shutil, "copyfile", copy_and_persist)
+    monkeypatch.setattr(snapshot.time, "sleep", lambda s: None)
+    dest = str(tmp_path / "copy")
+    assert snapshot.copy_segments(vector_path, dest) == ["segment-1/data_level0.bin", "segment-1/header.bin"]
+    assert len(calls) == 4
+    assert open(os.path.join(dest, "segment-1", "header.bin"), "rb").read() == b"h!"
+
+
+def test_segments_that_never_settle_fail(tmp_path, monkeypatch):
+    _, vector_path, _ = _stores(tmp_path)
+    copyfile = snapshot.shutil.copyfile
+
+    def copy_and_persist(src, dest):
+        copyfile(src, dest)
+        with open(src, "ab") as f:
+            f.write(b"!")
+
+    monkeypatch.setattr(snapshot.shutil, "copyfile", copy_and_persist)
+    monkeypatch.setattr(snapshot.time, "sleep", lambda s: None)
+    with pytest.raises(RuntimeError):
+        snapshot.copy_segments(vector_path, str(tmp_path / "copy"))
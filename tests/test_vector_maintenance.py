@@ -0,0 +1,34 @@
+import chromadb
+
+import vector_maintenance
+
+
+def _collection(client, name, count):
+    collection = client.create_collection(name)
+    collection.add(ids=[f"s{i}@x.com_aadhar_card" for i in range(count)],
+                   embeddings=[[float(i), 1.0, 0.0] for i in range(count)],
+                   metadatas=[{"email": f"s{i}@x.com"} for i in range(count)])
+    return collection
+
+
+def test_compact_recovers_after_crash_between_drop_and_rename(tmp_path):
+    vector_path = str(tmp_path / "vector_db")
+    client = chromadb.PersistentClient(path=vector_path)
+    live = _collection(client, "student_documents", 5)
+    # compact got as far as copying and dropping the live collection
+    rebuild = client.create_collection(vector_maintenance.rebuild_name("student_documents"))
+    vector_maintenance.copy_documents(live, rebuild, vector_maintenance.all_ids(live))
+    client.delete_collection("student_documents")
+
+    copied, _, _ = vector_maintenance.compact(vector_path, "student_documents")
+    assert copied == 5
+    assert [c.name for c in client.list_collections()] == ["student_documents"]
+    assert client.get_collection("student_documents").count() == 5
+
+
+def test_recovery_leaves_a_live_collection_alone(tmp_path):
+    client = chromadb.PersistentClient(path=str(tmp_path / "vector_db"))
+    _collection(client, "student_documents", 3)
+    _collection(client, vector_maintenance.rebuild_name("student_documents"), 1)  # partial copy
+    assert not vector_maintenance.recover_interrupted_compact(client, "student_documents")
+    assert client.get_collection("student_documents").count() == 3
@@ -0,0 +1,178 @@
+import argparse
+import os
+import sqlite3
+
+from config import DB_PATH, VECTOR_DB_PATH, COLLECTION_NAME, DOC_TYPES
+from document_validator import get_collection
+import duplicate_index
+
+# -------------------------
+# student_documents maintenance
+# -------------------------
+# Document ids are f"{email}_{doc_type}", so everything here deletes by id
+# lists in batches instead of metadata `where` filters (which scan every
+# row's metadata); deleted applicants' duplicate-index signatures go too.
+# `reconcile` removes vectors whose applicant is no longer in Primary_Data;
+# `compact` rebuilds the HNSW index without the deleted entries and shrinks
+# chroma.sqlite3.
+#
+#   python vector_maintenance.py reconcile [--dry-run]
+#   python vector_maintenance.py delete <email> [<email> ...]
+#   python vector_maintenance.py compact        # stop the portal first
+
+BATCH_SIZE = 500
+
+
+def document_ids(emails):
+    return [f"{email}_{doc_type}" for email in emails for doc_type in DOC_TYPES]
+
+
+def email_from_id(doc_id):
+    for doc_type in DOC_TYPES:
+        if doc_id.endswith(f"_{doc_type}"):
+            return doc_id[:-len(doc_type) - 1]
+    return None
+
+
+def _batches(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def delete_documents(collection, ids, batch_size=BATCH_SIZE):
+    """Delete by id, batch_size ids per call; unknown ids are ignored by Chroma"""
+    for batch in _batches(list(ids), batch_size):
+        collection.delete(ids=batch)
+    return len(ids)
+
+
+def delete_applicants(emails, collection=None, batch_size=BATCH_SIZE, db_path=DB_PATH):
+    deleted = delete_documents(collection or get_collection(), document_ids(emails), batch_size)
+    duplicate_index.forget_applicants(emails, db_path)
+    return deleted
+
+
+def all_ids(collection, batch_size=5000):
+    ids = []
+    offset = 0
+    while True:
+        batch = collection.get(include=[], limit=batch_size, offset=offset)["ids"]
+        ids += batch
+        if len(batch) < batch_size:
+            return ids
+        offset += batch_size
+
+
+def find_orphans(collection, db_path=DB_PATH):
+    """Ids whose applicant is not in Primary_Data (ids not in the email_doctype form are left alone)"""
+    conn = sqlite3.connect(db_path)
+    live = {row[0] for row in conn.execute("SELECT Email FROM Primary_Data")}
+    conn.close()
+    return [doc_id for doc_id in all_ids(collection)
+            if (email := email_from_id(doc_id)) is not None and email not in live]
+
+
+def reconcile(collection=None, db_path=DB_PATH, dry_run=False, batch_size=BATCH_SIZE):
+    collection = collection or get_collection()
+    orphans = find_orphans(collection, db_path)
+    if not dry_run:
+        delete_documents(collection, orphans, batch_size)
+        duplicate_index.forget_applicants({email_from_id(doc_id) for doc_id in orphans}, db_path)
+    return orphans
+
+
+# -------------------------
+# Compaction
+# -------------------------
+def rebuild_name(name):
+    return f"{name}_rebuild"
+
+
+def recover_interrupted_compact(client, name=COLLECTION_NAME):
+    """Finish a compact that stopped between dropping `name` and renaming its rebuild.
+
+    The rebuild is complete by then, so it simply takes the old name again.
+    Must run before anything calls get_or_create_collection(name), which
+    would otherwise start an empty collection. Returns True if it recovered.
+    """
+    names = {c.name for c in client.list_collections()}
+    if name in names or rebuild_name(name) not in names:
+        return False
+    client.get_collection(rebuild_name(name)).modify(name=name)
+    return True
+
+
+def copy_documents(source, dest, ids, batch_size=BATCH_SIZE):
+    """Copy entries with their stored embeddings (nothing is re-embedded); unknown ids are skipped"""
+    copied = 0
+    for batch in _batches(list(ids), batch_size):
+        rows = source.get(ids=batch, include=["embeddings", "documents", "metadatas"])
+        if not rows["ids"]:
+            continue
+        dest.upsert(
+            ids=rows["ids"],
+            embeddings=rows["embeddings"],
+            documents=rows["documents"],
+            metadatas=[m or {"email": email_from_id(i) or ""} for i, m in zip(rows["ids"], rows["metadatas"])],
+        )
+        copied += len(rows["ids"])
+    return copied
+
+
+def compact(vector_path=VECTOR_DB_PATH, name=COLLECTION_NAME, batch_size=BATCH_SIZE):
+    """Rebuild the collection's HNSW index from its stored embeddings, then VACUUM chroma.sqlite3.
+
+    hnswlib only marks deleted vectors, so an index that has seen a lot of
+    churn keeps its old size. Copying the live entries (embeddings included,
+    nothing is re-embedded) into a fresh collection drops them for good.
+    Running portals hold the old collection, so stop them first.
+    """
+    import chromadb
+
+    client = chromadb.PersistentClient(path=vector_path)
+    recover_interrupted_compact(client, name)
+    old = client.get_collection(name)
+    staging_name = rebuild_name(name)
+    try:
+        client.delete_collection(staging_name)
+    except ValueError:
+        pass
+    new = client.create_collection(staging_name, metadata=old.metadata)
+    copied = copy_documents(old, new, all_ids(old), batch_size)
+
+    # a crash between these two leaves only the rebuild; recover_interrupted_compact puts it back
+    client.delete_collection(name)
+    new.modify(name=name)
+
+    # chromadb 0.4 leaves a dropped collection's rows in embeddings_queue
+    chroma_db = os.path.join(vector_path, "chroma.sqlite3")
+    before = os.path.getsize(chroma_db)
+    conn = sqlite3.connect(chroma_db, timeout=30)
+    conn.execute("DELETE FROM embeddings_queue WHERE topic NOT IN (SELECT topic FROM collections)")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return copied, before, os.path.getsize(chroma_db)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintenance for the student_documents collection")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("reconcile", help="purge vectors of applicants missing from Primary_Data")
+    rec.add_argument("--dry-run", action="store_true")
+    rec.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    delete = sub.add_parser("delete", help="delete all documents of the given applicants")
+    delete.add_argument("emails", nargs="+")
+    sub.add_parser("compact", help="rebuild the HNSW index and VACUUM chroma.sqlite3")
+    args = parser.parse_args()
+
+    if args.command == "reconcile":
+        orphans = reconcile(dry_run=args.dry_run, batch_size=args.batch_size)
+        verb = "Would delete" if args.dry_run else "Deleted"
+        print(f"🧹 {verb} {len(orphans)} orphaned document(s) from {len({email_from_id(i) for i in orphans})} applicant(s)")
+    elif args.command == "delete":
+        delete_applicants(args.emails)
+        print(f"🗑️ Deleted documents of {len(args.emails)} applicant(s)")
+    elif args.command == "compact":
+        copied, before, after = compact()
+        print(f"✅ Rebuilt index with {copied} documents; chroma.sqlite3 {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")